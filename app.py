@@ -9,16 +9,24 @@ from blueprints.admin import admin_bp
 from blueprints.cashier import cashier_bp
 from blueprints.waiter import waiter_bp
 from blueprints.kitchen import kitchen_bp
+from services.rollup import rollup_cli
+from services.whatsapp import whatsapp_cli, init_worker
+from services.socket_queue import socketio_queue_options
 
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    # override konfigurasi (mis. test: database sqlite, worker dimatikan)
+    app.config.update(config or {})
 
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
-    socketio.init_app(app)
+    # message queue (Redis, dsb.) supaya emit dari worker mana pun sampai ke semua client
+    socketio.init_app(app, **socketio_queue_options(
+        app.config.get("SOCKETIO_MESSAGE_QUEUE"), app.config.get("SOCKETIO_CHANNEL")
+    ))
 
     # ⬇️ Tambahkan ini
     login_manager.login_view = "auth.login"
@@ -49,4 +57,11 @@ def create_app():
     app.register_blueprint(waiter_bp, url_prefix="/waiter")
     app.register_blueprint(kitchen_bp, url_prefix="/kitchen")
 
+    # perintah CLI tambahan
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(whatsapp_cli)
+
+    # worker outbox WhatsApp di proses ini (WHATSAPP_WORKER = "thread"), mulai saat request pertama
+    init_worker(app)
+
     return app
@@ -1,15 +1,20 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify, Response, stream_with_context
 from flask_login import login_required
 from extensions import db
-from models import MenuItem, Order, User, OrderItem, Feedback
+from models import MenuItem, Order, User, Feedback
 import os
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash
-from sqlalchemy import func, extract
-from calendar import month_abbr  
-from dateutil.relativedelta import relativedelta
+from services.dashboard import PERIODS, get_widget, invalidate_dashboard, dashboard_cache
+from services.catalog import bump_catalog_version, invalidate_catalog
+from services.cart import remove_menu_from_carts
+from services.pagination import order_history_page
+from services.periods import day_range
+from services.export import iter_order_csv
+from services.ticket_metrics import METRIC_PERIODS, ticket_time_report
+from services.stations import KITCHEN_STATIONS, normalize_station
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -19,487 +24,50 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 @admin_bp.route("/dashboard")
 @login_required
 def dashboard():
-    """Tampilan utama dashboard admin berisi ringkasan statistik dan grafik penjualan."""
-    
-    current_year = datetime.now().year 
-    current_month = datetime.now().month
-
-    # === Statistik Utama ===
-    total_users = User.query.count()
-    total_menu = MenuItem.query.count()
-
-    
-    # === Statistik Tahunan ===
-    yearly_data = (
-        db.session.query(
-            extract("year", Order.created_at).label("year"),
-            func.sum(Order.total).label("total_sales"),
-            func.count(Order.id).label("total_orders")
-        )
-        .group_by("year")
-        .order_by("year")
-        .all()
-    )
-    years = [int(y) for y, _, _ in yearly_data]
-    yearly_sales = [int(t or 0) for _, t, _ in yearly_data]
-    yearly_orders = [int(o or 0) for _, _, o in yearly_data]
-
-    # === Statistik Bulanan (tahun berjalan) ===
-    monthly_data = (
-        db.session.query(
-            extract("month", Order.created_at).label("month"),
-            func.sum(Order.total).label("total_sales"),
-            func.count(Order.id).label("total_orders")
-        )
-        .filter(extract("year", Order.created_at) == current_year)
-        .group_by("month")
-        .order_by("month")
-        .all()
-    )
-
-    months = [month_abbr[m] for m in range(1, 13)]
-    monthly_sales = [0] * 12
-    monthly_orders = [0] * 12
-    for m, sales, orders in monthly_data:
-        monthly_sales[int(m) - 1] = int(sales or 0)
-        monthly_orders[int(m) - 1] = int(orders or 0)
-
-    # === Statistik Mingguan (7 hari terakhir) ===
-    today = datetime.now()
-    week_start = today - timedelta(days=6)
-    weekly_data = (
-        db.session.query(
-            func.date(Order.created_at).label("date"),
-            func.sum(Order.total).label("total_sales"),
-            func.count(Order.id).label("total_orders")
-        )
-        .filter(Order.created_at >= week_start)
-        .group_by(func.date(Order.created_at))
-        .order_by(func.date(Order.created_at))
-        .all()
-    )
-
-    week_days, week_sales, week_orders = [], [], []
-    for i in range(7):
-        day = (week_start + timedelta(days=i)).date()
-        label = day.strftime("%a")
-        week_days.append(label)
-
-        record = next((x for x in weekly_data if x[0] == day), None)
-        week_sales.append(int(record[1] or 0) if record else 0)
-        week_orders.append(int(record[2] or 0) if record else 0)
-
-    # === Statistik Harian ===
-    start_of_day = datetime(today.year, today.month, today.day)
-    end_of_day = start_of_day + timedelta(days=1)
-
-    daily_sales = (
-        db.session.query(func.sum(Order.total))
-        .filter(Order.created_at >= start_of_day, Order.created_at < end_of_day)
-        .scalar() or 0
-    )
-    daily_orders = (
-        db.session.query(func.count(Order.id))
-        .filter(Order.created_at >= start_of_day, Order.created_at < end_of_day)
-        .scalar() or 0
-    )
-
-
-    # === Distribusi Menu Terjual per Periode === 
-    # 📆 Per tahun
-    menu_year_data = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(extract("year", Order.created_at) == current_year)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .all()
-    )
-    menu_year_labels = [m.name for m in menu_year_data]
-    menu_year_counts = [int(m.total_qty) for m in menu_year_data]
-
-    # 📆 Per bulan
-    menu_month_data = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .all()
-    )
-    menu_month_labels = [m.name for m in menu_month_data]
-    menu_month_counts = [int(m.total_qty) for m in menu_month_data]
-
-    # 📆 Per minggu
-    menu_week_data = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(Order.created_at >= week_start)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .all()
-    )
-    menu_week_labels = [m.name for m in menu_week_data]
-    menu_week_counts = [int(m.total_qty) for m in menu_week_data]
-
-    # 📆 Per hari
-    menu_day_data = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(Order.created_at >= start_of_day, Order.created_at < end_of_day)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .all()
-    )
-    menu_day_labels = [m.name for m in menu_day_data]
-    menu_day_counts = [int(m.total_qty) for m in menu_day_data]
-
-    # === Menu Terlaris ===
-    top_menu = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .limit(5)
-        .all()
-    )
-    top_menu_labels = [item.name for item in top_menu]
-    top_menu_counts = [int(item.total_qty) for item in top_menu]
-    menu_pairs = list(zip(top_menu_labels, top_menu_counts))
-
-
-
-    # === Menu dengan Pendapatan Tertinggi ===
-    top_revenue_menu = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity * MenuItem.price).label("revenue")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity * MenuItem.price).desc())
-        .first()
-    )
-    top_revenue_menu_name = top_revenue_menu.name if top_revenue_menu else "Belum ada data"
-    top_revenue_amount = top_revenue_menu.revenue if top_revenue_menu else 0
-    # 💰 Hitung total revenue semua menu bulan ini
-    total_revenue_month = (
-        db.session.query(func.sum(OrderItem.quantity * MenuItem.price))
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-
-    # 📊 Hitung persentase kontribusi menu teratas
-    top_menu_profit_percentage = (
-        (top_revenue_amount / total_revenue_month * 100) if total_revenue_month > 0 else 0
-    )
-
-
-    # === Rata-rata Rating Pelanggan ===
-    avg_rating = db.session.query(func.avg(Feedback.rating)).scalar() or 0
-
-    # === Pertumbuhan Penjualan (minggu ke minggu, per hari ke-N) ===
-    this_week_start = today - timedelta(days=today.weekday())  # Senin minggu ini
-    days_elapsed = (today - this_week_start).days  # berapa hari minggu ini sudah berjalan
-
-    # 🗓️ Hitung akhir periode yang sama minggu lalu
-    last_week_start = this_week_start - timedelta(days=7)
-    last_week_same_period_end = last_week_start + timedelta(days=days_elapsed)
-
-    # 💰 Total penjualan minggu ini (Senin → sekarang)
-    this_week_sales = (
-        db.session.query(func.sum(Order.total))
-        .filter(Order.created_at >= this_week_start)
-        .scalar() or 0
-    )
-
-    # 💰 Total penjualan minggu lalu (Senin → hari yang sama)
-    last_week_sales_same_period = (
-        db.session.query(func.sum(Order.total))
-        .filter(Order.created_at.between(last_week_start, last_week_same_period_end))
-        .scalar() or 0
-    )
-    
-    # === 📊 Pertumbuhan Penjualan Bulanan ===
-    # Total penjualan bulan ini
-    this_month_sales = (
-        db.session.query(func.sum(Order.total))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-
-    # Total penjualan bulan lalu
-    last_month = current_month - 1 if current_month > 1 else 12
-    last_month_year = current_year if current_month > 1 else current_year - 1
-
-    # 💡 Total pesanan bulan ini
-    total_orders = (
-        db.session.query(func.count(Order.id))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-    # 📊 Total pesanan bulan lalu
-    last_month_orders = (
-        db.session.query(func.count(Order.id))
-        .filter(extract("year", Order.created_at) == last_month_year)
-        .filter(extract("month", Order.created_at) == last_month)
-        .scalar() or 0
-    )
-
-    # 📈 Pertumbuhan pesanan
-    orders_growth = ((total_orders - last_month_orders) / last_month_orders * 100) if last_month_orders > 0 else 0
-
-    total_sales = (
-        db.session.query(func.sum(Order.total))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-
-    avg_order_value = (
-        db.session.query(func.avg(Order.total))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    ) 
-
-    last_month_sales = (
-        db.session.query(func.sum(Order.total))
-        .filter(extract("year", Order.created_at) == last_month_year)
-        .filter(extract("month", Order.created_at) == last_month)
-        .scalar() or 0
-    )
-
-    # Hitung pertumbuhan penjualan berdasarkan bulan (jika bulan lalu > 0)
-    if last_month_sales > 0:
-        sales_growth = ((this_month_sales - last_month_sales) / last_month_sales) * 100
-    else:
-        sales_growth = 0
-        
-    # === 📊 Pertumbuhan Total Pesanan ===
-    this_month_orders = (
-        db.session.query(func.count(Order.id))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-
-    last_month_orders = (
-        db.session.query(func.count(Order.id))
-        .filter(extract("year", Order.created_at) == last_month_year)
-        .filter(extract("month", Order.created_at) == last_month)
-        .scalar() or 0
-    )
-
-    orders_growth = ((this_month_orders - last_month_orders) / last_month_orders * 100) if last_month_orders > 0 else 0
-
-    # === 📊 Pertumbuhan Rata-rata Transaksi ===
-    this_month_avg_order = (
-        db.session.query(func.avg(Order.total))
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .scalar() or 0
-    )
-
-    last_month_avg_order = (
-        db.session.query(func.avg(Order.total))
-        .filter(extract("year", Order.created_at) == last_month_year)
-        .filter(extract("month", Order.created_at) == last_month)
-        .scalar() or 0
-    )
-
-    avg_order_growth = ((this_month_avg_order - last_month_avg_order) / last_month_avg_order * 100) if last_month_avg_order > 0 else 0
-
-    # === Jam Ramai (Peak Hours) ===
-    peak_hours = (
-        db.session.query(
-            extract("hour", Order.created_at).label("hour"),
-            func.count(Order.id).label("order_count")
-        )
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .group_by("hour")
-        .order_by(func.count(Order.id).desc())
-        .all()
-    )
-
-    peak_hour = f"{int(peak_hours[0][0]):02d}:00" if peak_hours else "-"
-
-    # Jam ramai tahun ini
-    peak_year = (
-        db.session.query(
-            extract("hour", Order.created_at).label("hour"),
-            func.count(Order.id).label("count")
-        )
-        .filter(extract("year", Order.created_at) == current_year)
-        .group_by("hour")
-        .order_by("hour")
-        .all()
-    )
-    peak_hours_year = [0] * 24
-    for h, c in peak_year:
-        peak_hours_year[int(h)] = int(c)
+    """
+    Tampilan utama dashboard admin (kerangka saja).
+    Angka & grafik diambil per widget lewat endpoint JSON di bawah sesuai tab yang dibuka.
+    """
+    api_urls = {
+        widget: {period: url_for(f"admin.dashboard_{widget}", period=period) for period in PERIODS}
+        for widget in ("sales", "menu", "peak")
+    }
+    api_urls["growth"] = url_for("admin.dashboard_growth")
+    return render_template("pages/admin/admin_dashboard.html", api_urls=api_urls)
+
+
+def _widget_response(widget, period=None):
+    """Response JSON widget dengan ETag/Last-Modified supaya refresh yang sama cukup dibalas 304."""
+    response = jsonify(get_widget(widget, period))
+    response.add_etag()
+    response.last_modified = dashboard_cache.last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@admin_bp.route("/dashboard/api/sales/<any(year, month, week, day):period>")
+@login_required
+def dashboard_sales(period):
+    return _widget_response("sales", period)
 
-    # Jam ramai bulan ini
-    peak_month = (
-        db.session.query(
-            extract("hour", Order.created_at).label("hour"),
-            func.count(Order.id).label("count")
-        )
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .group_by("hour")
-        .order_by("hour")
-        .all()
-    )
-    peak_hours_month = [0] * 24
-    for h, c in peak_month:
-        peak_hours_month[int(h)] = int(c)
 
-    # Jam ramai minggu ini
-    peak_week = (
-        db.session.query(
-            extract("hour", Order.created_at).label("hour"),
-            func.count(Order.id).label("count")
-        )
-        .filter(Order.created_at >= week_start)
-        .group_by("hour")
-        .order_by("hour")
-        .all()
-    )
-    peak_hours_week = [0] * 24
-    for h, c in peak_week:
-        peak_hours_week[int(h)] = int(c)
+@admin_bp.route("/dashboard/api/menu/<any(year, month, week, day):period>")
+@login_required
+def dashboard_menu(period):
+    return _widget_response("menu", period)
 
-    # Jam ramai hari ini
-    peak_day = (
-        db.session.query(
-            extract("hour", Order.created_at).label("hour"),
-            func.count(Order.id).label("count")
-        )
-        .filter(Order.created_at >= start_of_day, Order.created_at < end_of_day)
-        .group_by("hour")
-        .order_by("hour")
-        .all()
-    )
-    peak_hours_day = [0] * 24
-    for h, c in peak_day:
-        peak_hours_day[int(h)] = int(c)
-        
-    # === Insight Cepat (teks otomatis) ===
-    status_text = "meningkat" if sales_growth >= 0 else "menurun"
-    status_color = "text-success" if sales_growth >= 0 else "text-danger"
-
-    insight_text = (
-        f"Menu paling menguntungkan bulan ini: <strong>{top_revenue_menu_name}</strong> "
-        f"(<strong>{top_menu_profit_percentage:.1f}%</strong> dari total pendapatan bulan ini) | "
-        f"Penjualan <strong class='{status_color}'>{status_text}</strong> "
-        f"<strong class='{status_color}'>{abs(sales_growth):.1f}%</strong> dibanding bulan lalu | "
-        f"Puncak pesanan terjadi pukul <strong>{peak_hour or '-'}</strong>"
-    )
 
-    # 🍽️ Menu terlaris bulan ini (berdasarkan jumlah terjual)
-    top_menu_month = (
-        db.session.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label("total_qty")
-        )
-        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(extract("year", Order.created_at) == current_year)
-        .filter(extract("month", Order.created_at) == current_month)
-        .group_by(MenuItem.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .first()
-    )
+@admin_bp.route("/dashboard/api/peak/<any(year, month, week, day):period>")
+@login_required
+def dashboard_peak(period):
+    return _widget_response("peak", period)
 
-    # Jika ada hasil
-    top_menu_name = top_menu_month.name if top_menu_month else None
-    top_menu_qty = int(top_menu_month.total_qty) if top_menu_month else 0
-
-    
-    # === Render Template ===
-    return render_template(
-        "pages/admin/admin_dashboard.html",
-        total_orders=total_orders,
-        total_sales=total_sales,
-        total_users=total_users,
-        total_menu=total_menu,
-
-        years=years,
-        yearly_sales=yearly_sales,
-        yearly_orders=yearly_orders,
-
-        months=months,
-        monthly_sales=monthly_sales,
-        monthly_orders=monthly_orders,
-
-        week_days=week_days,
-        week_sales=week_sales,
-        week_orders=week_orders,
-
-        daily_sales=daily_sales,
-        daily_orders=daily_orders,
-
-        top_menu_labels=top_menu_labels,
-        top_menu_counts=top_menu_counts,
-        menu_pairs=menu_pairs,
-        top_menu_name=top_menu_name,
-        top_menu_qty=top_menu_qty,
-
-        avg_order_value=avg_order_value,
-        avg_rating=avg_rating,
-
-        top_revenue_menu_name=top_revenue_menu_name,
-        top_revenue_amount=top_revenue_amount,
-        top_menu_profit_percentage=top_menu_profit_percentage,
-        
-        sales_growth=sales_growth,
-        orders_growth=orders_growth,
-        avg_order_growth=avg_order_growth,
-
-        peak_hours_year=peak_hours_year,
-        peak_hours_month=peak_hours_month,
-        peak_hours_week=peak_hours_week,
-        peak_hours_day=peak_hours_day,
-        peak_hour=peak_hour,
-        insight_text=insight_text,
-
-        menu_year_labels=menu_year_labels,
-        menu_year_counts=menu_year_counts,
-        menu_month_labels=menu_month_labels,
-        menu_month_counts=menu_month_counts,
-        menu_week_labels=menu_week_labels,
-        menu_week_counts=menu_week_counts,
-        menu_day_labels=menu_day_labels,
-        menu_day_counts=menu_day_counts,
 
-    )
+@admin_bp.route("/dashboard/api/growth")
+@login_required
+def dashboard_growth():
+    return _widget_response("growth")
 
 # ========================
 # MENU MANAGEMENT
@@ -508,7 +76,7 @@ def dashboard():
 @login_required
 def manage_menu():
     items = MenuItem.query.order_by(MenuItem.id.desc()).all()
-    return render_template("pages/admin/menu_admin.html", items=items)
+    return render_template("pages/admin/menu_admin.html", items=items, stations=KITCHEN_STATIONS)
 
 @admin_bp.route("/menu/add", methods=["GET", "POST"])
 @login_required
@@ -518,6 +86,7 @@ def add_menu():
         description = request.form.get("description")
         price = float(request.form.get("price"))
         is_active = True if request.form.get("is_active") == "on" else False
+        station = normalize_station(request.form.get("station"))
 
         image_file = request.files.get("image")
         filename = None
@@ -533,14 +102,18 @@ def add_menu():
             description=description,
             price=price,
             image=filename,
-            is_active=is_active
+            is_active=is_active,
+            station=station
         )
         db.session.add(new_menu)
+        bump_catalog_version()
         db.session.commit()
+        invalidate_catalog()
+        invalidate_dashboard()
         flash("Menu berhasil ditambahkan", "success")
         return redirect(url_for("admin.manage_menu"))
 
-    return render_template("pages/admin/menu_admin_add.html")
+    return render_template("pages/admin/menu_admin_add.html", stations=KITCHEN_STATIONS)
 
 @admin_bp.route("/menu/edit/<int:item_id>", methods=["GET", "POST"])
 @login_required
@@ -551,6 +124,7 @@ def edit_menu(item_id):
         item.description = request.form["description"]
         item.price = float(request.form["price"])
         item.is_active = True if request.form.get("is_active") == "on" else False
+        item.station = normalize_station(request.form.get("station"))
 
         image_file = request.files.get("image")
         if image_file and image_file.filename:
@@ -561,11 +135,14 @@ def edit_menu(item_id):
             image_file.save(img_path)
             item.image = filename
 
+        bump_catalog_version()
         db.session.commit()
+        invalidate_catalog()
+        invalidate_dashboard()
         flash("Menu berhasil diperbarui", "success")
         return redirect(url_for("admin.manage_menu"))
 
-    return render_template("pages/admin/menu_admin_edit.html", item=item)
+    return render_template("pages/admin/menu_admin_edit.html", item=item, stations=KITCHEN_STATIONS)
 
 @admin_bp.route("/menu/delete/<int:item_id>")
 @login_required
@@ -577,8 +154,13 @@ def delete_menu(item_id):
         if os.path.exists(img_path):
             os.remove(img_path)
 
+    # termasuk keranjang yang sudah kadaluarsa tapi belum dibersihkan
+    remove_menu_from_carts(item.id)
     db.session.delete(item)
+    bump_catalog_version()
     db.session.commit()
+    invalidate_catalog()
+    invalidate_dashboard()
     flash(f"Menu '{item.name}' berhasil dihapus", "info")
     return redirect(url_for("admin.manage_menu"))
 
@@ -588,8 +170,20 @@ def delete_menu(item_id):
 @admin_bp.route("/orders")
 @login_required
 def manage_orders():
-    orders = Order.query.order_by(Order.id.desc()).all()
-    return render_template("pages/admin/admin_orders.html", orders=orders)
+    page = order_history_page(request.args)
+    return render_template("pages/admin/admin_riwayat_pesanan.html", orders=page.orders, page=page)
+
+@admin_bp.route("/orders/export")
+@login_required
+def export_orders():
+    """Export order + item ke CSV secara streaming (?start=YYYY-MM-DD&end=YYYY-MM-DD)."""
+    start, end = day_range(request.args.get("start"), request.args.get("end"))
+    filename = "lamogo_orders_" + datetime.now().strftime("%Y%m%d%H%M%S") + ".csv"
+    return Response(
+        stream_with_context(iter_order_csv(start, end)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 # ========================
 # USER MANAGEMENT
@@ -622,6 +216,7 @@ def add_user():
         )
         db.session.add(new_user)
         db.session.commit()
+        invalidate_dashboard()
         flash("User berhasil ditambahkan", "success")
         return redirect(url_for("admin.manage_users"))
 
@@ -655,6 +250,7 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_dashboard()
     flash(f"User '{user.name}' berhasil dihapus", "info")
     return redirect(url_for("admin.manage_users"))
 
@@ -665,12 +261,18 @@ def delete_user(user_id):
 @admin_bp.route("/riwayat_pesanan")
 @login_required
 def riwayat_pesanan():
-    orders = (
-        Order.query
-        .order_by(Order.created_at.desc())
-        .all()
-    )
-    return render_template("pages/admin/admin_riwayat_pesanan.html", orders=orders)
+    page = order_history_page(request.args)
+    return render_template("pages/admin/admin_riwayat_pesanan.html", orders=page.orders, page=page)
+
+# ========================
+# METRIK DAPUR (persentil waktu tiket)
+# ========================
+@admin_bp.route("/kitchen-metrics")
+@login_required
+def kitchen_metrics():
+    report = ticket_time_report(request.args.get("period"))
+    return render_template("pages/admin/admin_kitchen_metrics.html", report=report, periods=METRIC_PERIODS,
+                           stations=KITCHEN_STATIONS)
 
 # ========================
 # FEEDBACK MANAGEMENT
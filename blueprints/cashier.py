@@ -1,10 +1,18 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
-from flask_login import login_required
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask_login import login_required, current_user
 from extensions import db
-from models import MenuItem, Order, OrderItem, Feedback
-from sqlalchemy.orm import joinedload
-
-import requests
+from models import Order, OrderItem, Feedback
+from services.pagination import order_history_page
+from services.rollup import record_order
+from services.dashboard import invalidate_dashboard
+from services.whatsapp import enqueue_message, notify_worker
+from services.catalog import get_catalog
+from services.search import get_search_index, parse_limit, search_etag
+from services.cart import current_cart_id, cart_lines, add_line, set_line, remove_line, clear_cart
+from services.idempotency import new_checkout_key, checkout_key, find_checkout, remember_checkout
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 
 
 cashier_bp = Blueprint("cashier", __name__, url_prefix="/cashier")
@@ -15,69 +23,108 @@ cashier_bp = Blueprint("cashier", __name__, url_prefix="/cashier")
 @cashier_bp.route("/dashboard")
 @login_required
 def dashboard():
-    items = MenuItem.query.filter_by(is_active=True).all()
-    return render_template("pages/cashier/menu.html", menu=items, cart=session.get("cart", {}))
+    items = get_catalog().active
+    return render_template("pages/cashier/menu.html", menu=items, cart=_menu_cart_summary())
 
 
 @cashier_bp.route("/menu")
 def menu():
-    menu = MenuItem.query.all()
-    return render_template("pages/cashier/menu.html", menu=menu)
+    # hanya menu aktif: hanya menu aktif yang bisa masuk keranjang (lihat _orderable)
+    menu = get_catalog().active
+    return render_template("pages/cashier/menu.html", menu=menu, cart=_menu_cart_summary())
+
+
+def _menu_cart_summary():
+    # ringkasan keranjang di halaman menu (diperbarui di tempat lewat API JSON keranjang)
+    if current_user.is_authenticated and current_user.role == "cashier":
+        return _cart_summary(_cart_items(current_cart_id()))
+    return None
 
 @cashier_bp.route("/menu/search")
 def menu_search():
-    query = request.args.get("q", "").strip().lower()
-    if not query:
-        items = MenuItem.query.all()
+    query = request.args.get("q", "").strip()
+    limit = parse_limit(request.args.get("limit"))
+    index = get_search_index()
+
+    # hasil hanya bergantung pada versi katalog + query → 304 tanpa mencari ulang
+    etag = search_etag(index.version, query, limit)
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
     else:
-        items = MenuItem.query.filter(MenuItem.name.ilike(f"%{query}%")).all()
-
-    result = [{
-        "id": item.id,
-        "name": item.name,
-        "description": item.description,
-        "price": item.price,
-        "image": item.image
-    } for item in items]
-    
-    return jsonify(result)
+        # tanpa query → seluruh katalog (untuk tombol clear), selain itu hasil terurut relevansi
+        items = index.search(query, limit) if query else index.snapshot.active
+        response = jsonify([{
+            "id": item.id,
+            "name": item.name,
+            "description": item.description,
+            "price": item.price,
+            "image": item.image
+        } for item in items])
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 # ========================
 # KERANJANG
 # ========================
-@cashier_bp.route("/cart")
-@login_required
-def view_cart():
-    cart = session.get("cart", {})
-    items, total = [], 0
-    for id_str, qty_data in cart.items():
-        item = MenuItem.query.get(int(id_str))
+def _cart_items(cart_id) -> list:
+    """Isi keranjang + nama & harga dari snapshot katalog (menu yang sudah dihapus / nonaktif dilewati)."""
+    items = []
+    for line in cart_lines(cart_id):
+        item = _orderable(line.menu_item_id)
         if item:
-            # pastikan qty berupa angka
-            qty = qty_data["qty"] if isinstance(qty_data, dict) else qty_data
-            note = qty_data.get("note", "") if isinstance(qty_data, dict) else ""
             items.append({
                 "id": item.id,
                 "name": item.name,
                 "price": item.price,
-                "qty": qty,
-                "note": note,
+                "qty": line.qty,
+                "note": line.note,
+                "subtotal": item.price * line.qty,
             })
-            total += item.price * qty
+    return items
+
+
+def _orderable(menu_id):
+    """Menu dari katalog yang boleh dipesan (aktif); None kalau tidak ada / nonaktif."""
+    item = get_catalog().get(menu_id)
+    return item if item and item.is_active else None
 
-    return render_template("pages/cashier/cart.html", items=items, total=total)
+
+def _cart_summary(items) -> dict:
+    return {"total": sum(item["subtotal"] for item in items), "count": sum(item["qty"] for item in items)}
+
+
+@cashier_bp.app_context_processor
+def cart_badge():
+    # jumlah item untuk badge "Keranjang" di navbar; dihitung dari keranjang di server hanya saat dirender
+    def cart_count():
+        if current_user.is_authenticated and current_user.role == "cashier":
+            return _cart_summary(_cart_items(current_cart_id()))["count"]
+        return 0
+    return dict(cart_count=cart_count)
+
+
+@cashier_bp.route("/cart")
+@login_required
+def view_cart():
+    items = _cart_items(current_cart_id())
+    return render_template("pages/cashier/cart.html", items=items, total=_cart_summary(items)["total"],
+                           checkout_key=new_checkout_key())
 
 
 @cashier_bp.route("/add_to_cart", methods=["POST"])
 @login_required
 def add_to_cart():
-    menu_id = request.form.get("menu_id")
+    item = _orderable(request.form.get("menu_id"))
     quantity = int(request.form.get("quantity", 1))
+    if not item or quantity <= 0:
+        flash("Menu tidak ditemukan", "warning")
+        return redirect(url_for("cashier.menu"))
 
-    cart = session.get("cart", {})
-    cart[menu_id] = cart.get(menu_id, 0) + quantity
-    session["cart"] = cart
+    add_line(current_cart_id(create=True), item.id, quantity)
+    db.session.commit()
     flash("Item ditambahkan ke keranjang", "success")
     return redirect(url_for("cashier.menu"))
 
@@ -85,9 +132,10 @@ def add_to_cart():
 @cashier_bp.route("/remove_from_cart/<int:item_id>")
 @login_required
 def remove_from_cart(item_id):
-    cart = session.get("cart", {})
-    cart.pop(str(item_id), None)
-    session["cart"] = cart
+    cart_id = current_cart_id()
+    if cart_id:
+        remove_line(cart_id, item_id)
+        db.session.commit()
     flash("Item dihapus dari keranjang", "info")
     return redirect(url_for("cashier.view_cart"))
 
@@ -95,24 +143,100 @@ def remove_from_cart(item_id):
 @cashier_bp.route("/update_cart", methods=["POST"])
 @login_required
 def update_cart():
-    cart = session.get("cart", {})
-    for key in list(cart.keys()):
-        qty = request.form.get(f"qty_{key}")
-        note = request.form.get(f"note_{key}", "").strip()
-        if qty:
-            qty = int(qty)
-            if qty > 0:
-                cart[key] = {"qty": qty, "note": note}
-            else:
-                cart.pop(key, None)
-    session["cart"] = cart
+    cart_id = current_cart_id()
+    for line in cart_lines(cart_id):
+        qty = request.form.get(f"qty_{line.menu_item_id}")
+        note = request.form.get(f"note_{line.menu_item_id}", "")
+        if qty and (int(qty) != line.qty or note.strip() != line.note):
+            set_line(cart_id, line.menu_item_id, int(qty), note)
+    db.session.commit()
     flash("Keranjang diperbarui", "success")
     return redirect(url_for("cashier.view_cart"))
 
 
+# ========================
+# API JSON KERANJANG (halaman menu diperbarui di tempat, tanpa redirect & render ulang)
+# ========================
+def _cart_response(cart_id, menu_item_id=None, include_items=False):
+    """Baris yang baru diubah (None kalau sudah dihapus) + total & jumlah item keranjang."""
+    items = _cart_items(cart_id)
+    body = {"line": next((item for item in items if item["id"] == menu_item_id), None), **_cart_summary(items)}
+    if include_items:
+        body["items"] = items
+    return jsonify(body)
+
+
+def _json_quantity(data, default=None):
+    try:
+        return int(data.get("quantity", default))
+    except (TypeError, ValueError):
+        return None
+
+
+@cashier_bp.route("/api/cart")
+@login_required
+def api_cart():
+    return _cart_response(current_cart_id(), include_items=True)
+
+
+@cashier_bp.route("/api/cart/items", methods=["POST"])
+@login_required
+def api_cart_add():
+    """Body JSON: {"menu_id": 3, "quantity": 1} → qty ditambahkan ke baris menu tersebut."""
+    data = request.get_json(silent=True) or {}
+    item = _orderable(data.get("menu_id"))
+    quantity = _json_quantity(data, 1)
+    if not item:
+        return jsonify({"error": "Menu tidak ditemukan"}), 404
+    if quantity is None or quantity <= 0:
+        return jsonify({"error": "quantity harus angka > 0"}), 400
+
+    cart_id = current_cart_id(create=True)
+    add_line(cart_id, item.id, quantity)
+    db.session.commit()
+    return _cart_response(cart_id, item.id)
+
+
+@cashier_bp.route("/api/cart/items/<int:menu_id>", methods=["PATCH"])
+@login_required
+def api_cart_update(menu_id):
+    """Body JSON: {"quantity": 2, "note": "pedas"} (keduanya opsional); quantity 0 menghapus baris."""
+    data = request.get_json(silent=True) or {}
+    quantity = _json_quantity(data)
+    note = data.get("note")
+    if "quantity" in data and quantity is None:
+        return jsonify({"error": "quantity harus berupa angka"}), 400
+    if note is not None and not isinstance(note, str):
+        return jsonify({"error": "note harus berupa teks"}), 400
+
+    cart_id = current_cart_id()
+    line = next((line for line in cart_lines(cart_id) if line.menu_item_id == menu_id), None)
+    if line is None:
+        return jsonify({"error": "Menu tidak ada di keranjang"}), 404
+    set_line(cart_id, menu_id, line.qty if quantity is None else quantity, note)
+    db.session.commit()
+    return _cart_response(cart_id, menu_id)
+
+
+@cashier_bp.route("/api/cart/items/<int:menu_id>", methods=["DELETE"])
+@login_required
+def api_cart_remove(menu_id):
+    cart_id = current_cart_id()
+    if cart_id:
+        remove_line(cart_id, menu_id)
+        db.session.commit()
+    return _cart_response(cart_id)
+
+
 # ========================
 # CHECKOUT
 # ========================
+def _checkout_replay(order_id):
+    # checkout dengan kunci yang sama sudah pernah berhasil → tidak ada yang dibuat / dikirim ulang
+    flash(f"Pesanan #{order_id} sudah tercatat sebelumnya, tidak dibuat ulang", "info")
+    return redirect(url_for("cashier.dashboard"))
+
+
 @cashier_bp.route("/checkout", methods=["POST"])
 @login_required
 def checkout():
@@ -122,11 +246,43 @@ def checkout():
     amount_paid = request.form.get("amount_paid")
     change_due = request.form.get("change_due")
 
-    cart = session.get("cart", {})
+    # tap ganda / retry: kunci yang sama → kembalikan order pertama
+    key = checkout_key()
+    existing = find_checkout(key)
+    if existing is not None:
+        return _checkout_replay(existing)
+
+    cart_id = current_cart_id()
+    cart = cart_lines(cart_id)
     if not cart:
         flash("Keranjang kosong", "warning")
         return redirect(url_for("cashier.dashboard"))
 
+    # 1) resolusi harga & nama dari snapshot katalog (tanpa query), total dihitung sekalian
+    lines = []
+    unavailable = []
+    total = 0
+    for line in cart:
+        item = _orderable(line.menu_item_id)
+        if not item:
+            unavailable.append(line.menu_item_id)
+            continue
+        lines.append({"menu_item_id": item.id, "name": item.name, "quantity": line.qty,
+                      "price": item.price, "notes": line.note, "station": item.station})
+        total += item.price * line.qty
+
+    if unavailable:
+        # menu dihapus / dinonaktifkan setelah masuk keranjang: total berubah → kasir cek ulang keranjang dulu
+        catalog = get_catalog()
+        names = [getattr(catalog.get(menu_id), "name", f"#{menu_id}") for menu_id in unavailable]
+        for menu_id in unavailable:
+            remove_line(cart_id, menu_id)
+        db.session.commit()
+        flash(f"Menu tidak tersedia lagi dan dihapus dari keranjang: {', '.join(names)}. Periksa ulang total.",
+              "warning")
+        return redirect(url_for("cashier.view_cart"))
+
+    # 2) INSERT order (sudah dengan total) lalu semua item dalam satu executemany
     order = Order(
         customer_name=customer_name,
         customer_phone=customer_phone,
@@ -134,48 +290,45 @@ def checkout():
         status="open",
         amount_paid=int(amount_paid) if amount_paid else None,
         change_due=int(change_due) if change_due else None,
-        total=0
+        total=total,
+        open_items=len(lines),
+        created_at=datetime.now(),
+        idempotency_key=key
     )
     db.session.add(order)
-    db.session.flush()
-
-    total = 0
-    
-    for id_str, item_data in cart.items():
-        item = MenuItem.query.get(int(id_str))
-        if not item:
-            continue
-
-        if isinstance(item_data, dict):
-            qty = item_data.get("qty", 1)
-            note = item_data.get("note", "")
-        else:
-            qty = int(item_data)
-            note = ""
-
-        order_item = OrderItem(
-            order_id=order.id,
-            menu_item_id=item.id,
-            quantity=qty,
-            price=item.price,
-            status="open",
-            notes=note,
-        )
-
-        db.session.add(order_item) 
-        total += item.price * qty
-
-    order.total = total
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # request kembar yang berjalan bersamaan sudah lebih dulu menyimpan kunci ini (index unik)
+        db.session.rollback()
+        existing = find_checkout(key)
+        if existing is None:
+            raise
+        return _checkout_replay(existing)
+
+    if lines:
+        db.session.execute(insert(OrderItem), [
+            {"order_id": order.id, "menu_item_id": line["menu_item_id"], "quantity": line["quantity"],
+             "price": line["price"], "status": "open", "notes": line["notes"], "station": line["station"]}
+            for line in lines
+        ])
+
+    # update rollup dashboard di transaksi yang sama
+    record_order(order.created_at, total,
+                 [(line["menu_item_id"], line["quantity"], line["price"]) for line in lines])
+
+    # struk WhatsApp masuk outbox di transaksi yang sama; dikirim worker setelah commit
+    if customer_phone:
+        enqueue_message(customer_phone, create_whatsapp_message(order, lines), order_id=order.id)
+
+    # keranjang dikosongkan di transaksi yang sama → checkout ulang keranjang yang sama tidak membuat order dobel
+    clear_cart(cart_id)
+
+    order_id = order.id  # dibaca sebelum commit: setelah commit atributnya expired → SELECT ulang
     db.session.commit()
-    session["cart"] = {}
-
-    # kirim pesan WhatsApp otomatis
-    phone = customer_phone.strip().replace(" ", "")
-    if phone.startswith("0"):
-        phone = "62" + phone[1:]  # ubah ke format internasional
-
-    message = create_whatsapp_message(order)
-    send_fonnte_message(phone, message)
+    remember_checkout(key, order_id)
+    invalidate_dashboard()
+    notify_worker()
 
     flash("Pesanan berhasil dibuat dan struk dikirim ke WhatsApp ✅", "success")
     return redirect(url_for("cashier.dashboard"))
@@ -211,6 +364,7 @@ def feedback_form(order_id):
 
         db.session.add(feedback)
         db.session.commit()
+        invalidate_dashboard()
 
         # flash("Terima kasih atas feedback Anda!", "success")
         return redirect(url_for("cashier.thank_you"))
@@ -225,39 +379,16 @@ def thank_you():
 @cashier_bp.route("/orders")
 @login_required
 def order():
-    orders = (
-        Order.query
-        .options(joinedload(Order.items).joinedload(OrderItem.menu_item))
-        .order_by(Order.id.desc())
-        .all()
-    )
-    return render_template("pages/cashier/orders.html", orders=orders)
+    page = order_history_page(request.args)
+    return render_template("pages/cashier/orders.html", orders=page.orders, page=page)
 
 
 
 # ========================
 # HELPER FUNCTIONS
 # ========================
-def send_fonnte_message(phone, message):
-    api_key = "ASk4Nsv7WSBhbjhchWkn"
-
-    headers = {
-        "Authorization": api_key
-    }
-
-    data = {
-        "target": phone,
-        "message": message
-    }
-
-    try:
-        response = requests.post("https://api.fonnte.com/send", data=data, headers=headers)
-        print("Fonnte Response:", response.text)
-    except Exception as e:
-        print("Gagal mengirim pesan WhatsApp:", e)
-
-
-def create_whatsapp_message(order: Order):
+def create_whatsapp_message(order: Order, items):
+    """Struk WhatsApp dari order + baris item yang sudah di-resolve saat checkout (tanpa lazy-load)."""
     lines = []
     lines.append(f" *Struk Pembelian #{order.id}*")
     lines.append("")
@@ -266,11 +397,11 @@ def create_whatsapp_message(order: Order):
     lines.append(f" *Metode:* {order.payment_method.upper()}")
     lines.append("──────────────────────")
 
-    for item in order.items:
-        subtotal = item.quantity * item.price
-        lines.append(f"{item.menu_item.name} x{item.quantity} - Rp {subtotal:,.0f}".replace(",", "."))
-        if item.notes:
-            lines.append(f"Catatan: {item.notes}")
+    for item in items:
+        subtotal = item["quantity"] * item["price"]
+        lines.append(f"{item['name']} x{item['quantity']} - Rp {subtotal:,.0f}".replace(",", "."))
+        if item["notes"]:
+            lines.append(f"Catatan: {item['notes']}")
 
     lines.append("──────────────────────")
     lines.append(f" *Total:* Rp {order.total:,.0f}".replace(",", "."))
@@ -1,56 +1,215 @@
-from flask import Blueprint, render_template, redirect, url_for, flash
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required
-from extensions import db, socketio   # ✅ ambil dari extensions
+from sqlalchemy.orm import joinedload
+from extensions import db
 from models import OrderItem
+from services.dashboard import invalidate_dashboard
+from services.order_state import transition_item, transition_items, InvalidTransition, ItemNotFound
+from services.realtime import (
+    KITCHEN_ROOM, record_order_update, emit_order_update, emit_order_update_batch,
+    latest_seq, order_changes, item_payload, change_payload,
+)
+from services.event_stream import order_event_stream
+from services.stations import KITCHEN_STATIONS, normalize_station, station_room
+from services.cook_view import COOK_STATUSES, cook_groups, group_item_ids
 
 kitchen_bp = Blueprint("kitchen", __name__, url_prefix="/kitchen")
 
+
+def _pending_items(station=None):
+    # Item yang belum selesai, semua atau satu station (index status + station);
+    # nama menu ikut di-load, tanpa query per baris
+    query = (
+        OrderItem.query.options(joinedload(OrderItem.menu_item))
+        .filter(OrderItem.status.in_(["open", "cooking"]))
+    )
+    if station:
+        query = query.filter(OrderItem.station == station)
+    return query.order_by(OrderItem.id).all()
+
+def _station():
+    """?station=grill → layar satu station; kosong → semua item dapur."""
+    return normalize_station(request.args.get("station"))
+
+def _room(station):
+    return station_room(station) if station else KITCHEN_ROOM
+
 @kitchen_bp.route("/dashboard")
 @login_required
 def dashboard():
-    # Semua item yang belum selesai
-    items = OrderItem.query.filter(OrderItem.status.in_(["open", "cooking"])).all()
-    return render_template("pages/kitchen/dashboard.html", items=items)
+    station = _station()
+    seq = latest_seq()  # dibaca sebelum item: event setelah ini diambil lewat /kitchen/changes
+    items = _pending_items(station)
+    return render_template("pages/kitchen/dashboard.html", items=items, seq=seq,
+                           station=station, stations=KITCHEN_STATIONS)
 
-@kitchen_bp.route("/cooking/<int:item_id>")
+@kitchen_bp.route("/changes")
 @login_required
-def mark_cooking(item_id):
-    item = OrderItem.query.get_or_404(item_id)
-    item.status = "cooking"
+def changes():
+    """Event yang terlewat sejak ?since=<seq> (dipanggil layar dapur saat reconnect)."""
+    station = _station()
+    since = request.args.get("since", type=int)
+    return jsonify(order_changes(_room(station), since, lambda: [item_payload(i) for i in _pending_items(station)]))
 
-    # update status order → pending
-    order = item.order
-    if order.status != "pending":  
-        order.status = "pending"
+@kitchen_bp.route("/stream")
+@login_required
+def stream():
+    """Event yang sama lewat Server-Sent Events, untuk tablet yang tidak bisa memakai Socket.IO."""
+    station = _station()
+    return order_event_stream(_room(station), lambda: [item_payload(i) for i in _pending_items(station)])
 
+# ========================
+# TRANSISI STATUS ITEM (lihat services/order_state.py)
+# ========================
+def _apply(item_id, target):
+    """Transisi atomik satu item, commit bersama event-nya, lalu kirim ke room terkait."""
+    try:
+        change = transition_item(item_id, target)
+    except InvalidTransition:
+        db.session.rollback()
+        raise
+    event = record_order_update(change_payload(change))
     db.session.commit()
+    invalidate_dashboard()
+    emit_order_update(event)
+    return event
 
-    # broadcast event ke semua client
-    socketio.emit("order_update", {
-        "id": item.id, 
-        "status": "cooking",
-        "order_id": item.order_id,
-        "order_status": order.status
-    })
-
-    flash(f"{item.menu_item.name} sedang dimasak", "info")
+@kitchen_bp.route("/cooking/<int:item_id>")
+@login_required
+def mark_cooking(item_id):
+    try:
+        event = _apply(item_id, "cooking")
+        flash(f"{event['menu_name']} sedang dimasak", "info")
+    except InvalidTransition:
+        flash("Item tidak ditemukan atau statusnya sudah berubah", "warning")
     return redirect(url_for("kitchen.dashboard"))
 
 @kitchen_bp.route("/ready/<int:item_id>")
 @login_required
 def mark_ready(item_id):
-    item = OrderItem.query.get_or_404(item_id)
-    item.status = "ready"
+    try:
+        event = _apply(item_id, "ready")
+        flash(f"{event['menu_name']} sudah selesai dimasak", "success")
+    except InvalidTransition:
+        flash("Item tidak ditemukan atau statusnya sudah berubah", "warning")
+    return redirect(url_for("kitchen.dashboard"))
+
+# API JSON: dipanggil tombol di layar dapur; tampilan diperbarui dari event socket
+@kitchen_bp.route("/api/items/<int:item_id>/cooking", methods=["POST"])
+@login_required
+def api_mark_cooking(item_id):
+    _apply(item_id, "cooking")
+    return "", 204
+
+@kitchen_bp.route("/api/items/<int:item_id>/ready", methods=["POST"])
+@login_required
+def api_mark_ready(item_id):
+    _apply(item_id, "ready")
+    return "", 204
+
+@kitchen_bp.errorhandler(InvalidTransition)
+def invalid_transition(error):
+    # hanya sampai ke sini dari endpoint API (route GET menangani sendiri dengan flash)
+    return jsonify({"error": str(error), "item_ids": error.item_ids}), 409
+
+@kitchen_bp.errorhandler(ItemNotFound)
+def item_not_found(error):
+    return jsonify({"error": str(error), "item_ids": error.item_ids}), 404
+
+# ========================
+# TRANSISI STATUS BANYAK ITEM SEKALIGUS
+# ========================
+BATCH_STATUSES = ("cooking", "ready")
+
+@kitchen_bp.route("/api/items/status", methods=["POST"])
+@login_required
+def api_batch_status():
+    """
+    Ubah status banyak item dalam satu transaksi.
+    Body JSON: {"status": "cooking"|"ready", "item_ids": [..]} atau {"status": ..., "order_id": 12},
+    opsional "station": "grill" supaya hanya item station tersebut yang diubah.
+    Item yang statusnya tidak sah untuk transisi tersebut dilewati.
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get("status")
+    if status not in BATCH_STATUSES:
+        return jsonify({"error": "status harus 'cooking' atau 'ready'"}), 400
+
+    try:
+        order_id = int(data["order_id"]) if data.get("order_id") is not None else None
+        requested_ids = [int(i) for i in data.get("item_ids") or []]
+    except (TypeError, ValueError):
+        return jsonify({"error": "item_ids / order_id harus berupa angka"}), 400
+    if order_id is None and not requested_ids:
+        return jsonify({"error": "item_ids atau order_id wajib diisi"}), 400
+
+    return _apply_batch(status, item_ids=requested_ids, order_id=order_id,
+                        station=normalize_station(data.get("station")))
+
+def _apply_batch(status, **selection):
+    """transition_items + event per order, commit, lalu kirim sebagai satu order_update_batch."""
+    try:
+        changes = transition_items(status, **selection)
+    except InvalidTransition:
+        db.session.rollback()
+        raise
+    if not changes:
+        return jsonify({"updated": []})
+
+    # satu event per order (berisi semua item order itu), dikirim sebagai satu order_update_batch
+    events = []
+    for order_id in sorted({change.order_id for change in changes}):
+        items = [change_payload(change) for change in changes if change.order_id == order_id]
+        events.append(record_order_update({
+            "order_id": order_id,
+            "status": status,
+            "order_status": items[0]["order_status"],
+            "items": items,
+        }))
+
     db.session.commit()
+    invalidate_dashboard()
+    emit_order_update_batch(events)
+    return jsonify({"updated": [change.id for change in changes], "seq": [event["seq"] for event in events]})
 
-    # kirim detail biar waiter bisa render row baru
-    socketio.emit("order_update", {
-        "id": item.id,
-        "order_id": item.order_id,
-        "status": "ready",
-        "menu_name": item.menu_item.name,
-        "quantity": item.quantity
-    })
+# ========================
+# TAMPILAN MASAK: item yang sama dari banyak order digabung jadi satu baris
+# ========================
+@kitchen_bp.route("/cook-view")
+@login_required
+def cook_view():
+    station = _station()
+    seq = latest_seq()
+    return render_template("pages/kitchen/cook_view.html", groups=cook_groups(station), seq=seq,
+                           station=station, stations=KITCHEN_STATIONS)
 
-    flash(f"{item.menu_item.name} sudah selesai dimasak", "success")
-    return redirect(url_for("kitchen.dashboard"))
+@kitchen_bp.route("/api/groups")
+@login_required
+def api_groups():
+    """Grup terbaru (dipanggil tampilan masak setiap ada event; jauh lebih kecil dari daftar item)."""
+    station = _station()
+    seq = latest_seq()
+    return jsonify({"seq": seq, "groups": cook_groups(station)})
+
+@kitchen_bp.route("/api/groups/status", methods=["POST"])
+@login_required
+def api_group_status():
+    """
+    Tandai satu grup sekaligus.
+    Body JSON: {"status": "cooking"|"ready", "menu_item_id": 3, "notes": "pedas", "from": "open"|"cooking",
+    "station": "grill" (opsional)}. Item grup yang statusnya sudah berubah dilewati.
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get("status")
+    source = data.get("from")
+    if status not in BATCH_STATUSES or source not in COOK_STATUSES:
+        return jsonify({"error": "status harus 'cooking'/'ready' dan from harus 'open'/'cooking'"}), 400
+    try:
+        menu_item_id = int(data.get("menu_item_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "menu_item_id harus berupa angka"}), 400
+
+    item_ids = group_item_ids(menu_item_id, data.get("notes"), source, normalize_station(data.get("station")))
+    if not item_ids:
+        return jsonify({"updated": []})
+    return _apply_batch(status, item_ids=item_ids)
@@ -1,45 +1,90 @@
-from flask import Blueprint, render_template, redirect, url_for, flash
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required
-from extensions import db, socketio   # ambil socketio dari extensions
-from models import Order, OrderItem
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models import OrderItem
+from services.dashboard import invalidate_dashboard
+from services.order_state import transition_item, InvalidTransition, ItemNotFound
+from services.realtime import (
+    WAITER_ROOM, record_order_update, emit_order_update, latest_seq, order_changes, item_payload, change_payload
+)
+from services.event_stream import order_event_stream
 
 waiter_bp = Blueprint("waiter", __name__, url_prefix="/waiter")
 
+
+def _ready_items():
+    # Ambil semua item yang sudah ready, tapi belum delivered
+    return (
+        OrderItem.query.options(joinedload(OrderItem.menu_item))
+        .filter(OrderItem.status == "ready")
+        .order_by(OrderItem.id)
+        .all()
+    )
+
 @waiter_bp.route("/dashboard")
 @login_required
 def dashboard():
-    # Ambil semua item yang sudah ready, tapi belum delivered
-    items = OrderItem.query.filter(OrderItem.status == "ready").all()
-    return render_template("pages/waiter/dashboard.html", items=items)
+    seq = latest_seq()  # dibaca sebelum item: event setelah ini diambil lewat /waiter/changes
+    items = _ready_items()
+    return render_template("pages/waiter/dashboard.html", items=items, seq=seq)
+
+@waiter_bp.route("/changes")
+@login_required
+def changes():
+    """Event yang terlewat sejak ?since=<seq> (dipanggil layar waiter saat reconnect)."""
+    since = request.args.get("since", type=int)
+    return jsonify(order_changes(WAITER_ROOM, since, lambda: [item_payload(i) for i in _ready_items()]))
 
-def _maybe_close_order(order: Order) -> None:
+@waiter_bp.route("/stream")
+@login_required
+def stream():
+    """Event yang sama lewat Server-Sent Events, untuk tablet yang tidak bisa memakai Socket.IO."""
+    return order_event_stream(WAITER_ROOM, lambda: [item_payload(i) for i in _ready_items()])
+
+# ========================
+# TRANSISI STATUS ITEM (lihat services/order_state.py)
+# ========================
+def _deliver(item_id):
     """
-    Tutup order jika semua OrderItem sudah delivered/close.
+    Tandai item delivered secara atomik; order otomatis close di UPDATE yang sama
+    kalau itu item terakhir (counter Order.open_items).
     """
-    allowed_done = {"delivered", "close"}         # status item yang dianggap selesai
-    if all(i.status in allowed_done for i in order.items):
-        if order.status != "close":
-            order.status = "close"
-            db.session.commit()
+    try:
+        change = transition_item(item_id, "delivered")
+    except InvalidTransition:
+        db.session.rollback()
+        raise
+    event = record_order_update(change_payload(change))
+    db.session.commit()
+    invalidate_dashboard()
+
+    # kirim ke dapur & waiter + kasir yang memantau order ini
+    emit_order_update(event)
+    return event
 
 @waiter_bp.route("/deliver/<int:item_id>")
 @login_required
 def deliver_item(item_id):
-    item = OrderItem.query.get_or_404(item_id)
-    item.status = "delivered"
-    db.session.commit()
+    try:
+        event = _deliver(item_id)
+        flash(f"Pesanan {event['menu_name']} berhasil diantar ✅", "success")
+    except InvalidTransition:
+        flash("Item tidak ditemukan atau sudah diantar", "warning")
+    return redirect(url_for("waiter.dashboard"))
 
-    # cek semua item pada order; jika semua delivered/close → order close
-    order = Order.query.get(item.order_id)
-    _maybe_close_order(order)
+# API JSON: dipanggil tombol di layar waiter; tampilan diperbarui dari event socket
+@waiter_bp.route("/api/items/<int:item_id>/deliver", methods=["POST"])
+@login_required
+def api_deliver_item(item_id):
+    _deliver(item_id)
+    return "", 204
 
-    # broadcast realtime
-    socketio.emit("order_update", {
-        "id": item.id,
-        "order_id": item.order_id,
-        "status": item.status,          # "delivered"
-        "order_status": order.status    # bisa "close" kalau semua selesai
-    })
+@waiter_bp.errorhandler(InvalidTransition)
+def invalid_transition(error):
+    # hanya sampai ke sini dari endpoint API (route GET menangani sendiri dengan flash)
+    return jsonify({"error": str(error), "item_ids": error.item_ids}), 409
 
-    flash(f"Pesanan {item.menu_item.name} berhasil diantar ✅", "success")
-    return redirect(url_for("waiter.dashboard"))
\ No newline at end of file
+@waiter_bp.errorhandler(ItemNotFound)
+def item_not_found(error):
+    return jsonify({"error": str(error), "item_ids": error.item_ids}), 404
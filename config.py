@@ -7,3 +7,46 @@ class Config:
         "mysql+pymysql://root@localhost:3306/lamogo_db"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Socket.IO multi-worker: "redis://localhost:6379/0", "amqp://...", atau "local://" (test/dev, satu proses).
+    # Kosong = tanpa message queue (hanya boleh satu worker).
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "lamogo-socketio")
+
+    # cache dashboard admin (detik, 0 = nonaktif)
+    DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 60))
+
+    # cache katalog menu: seberapa sering (detik) versi katalog dicek ke database
+    CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", 5))
+
+    # WhatsApp (Fonnte) — dikirim lewat outbox oleh worker background
+    FONNTE_API_URL = os.getenv("FONNTE_API_URL", "https://api.fonnte.com/send")
+    FONNTE_API_KEY = os.getenv("FONNTE_API_KEY", "ASk4Nsv7WSBhbjhchWkn")
+    # "thread" = worker jalan di proses web, "external" = jalankan `flask whatsapp worker` terpisah
+    WHATSAPP_WORKER = os.getenv("WHATSAPP_WORKER", "thread")
+    WHATSAPP_CONNECT_TIMEOUT = float(os.getenv("WHATSAPP_CONNECT_TIMEOUT", 3))
+    WHATSAPP_READ_TIMEOUT = float(os.getenv("WHATSAPP_READ_TIMEOUT", 10))
+    WHATSAPP_MAX_ATTEMPTS = int(os.getenv("WHATSAPP_MAX_ATTEMPTS", 5))
+    WHATSAPP_BACKOFF_BASE = float(os.getenv("WHATSAPP_BACKOFF_BASE", 10))       # detik
+    WHATSAPP_BACKOFF_MAX = float(os.getenv("WHATSAPP_BACKOFF_MAX", 1800))       # detik
+    WHATSAPP_POLL_INTERVAL = float(os.getenv("WHATSAPP_POLL_INTERVAL", 5))      # detik
+
+    # event status order untuk resync layar dapur/waiter setelah koneksi putus
+    ORDER_EVENT_RETENTION = int(os.getenv("ORDER_EVENT_RETENTION", 5000))   # jumlah event terakhir yang disimpan
+    ORDER_EVENT_MAX_DELTA = int(os.getenv("ORDER_EVENT_MAX_DELTA", 500))    # lebih dari ini → kirim snapshot
+    # event socket dikumpulkan sekian detik lalu dikirim sebagai satu batch per room (0 = langsung kirim)
+    ORDER_EVENT_COALESCE_WINDOW = float(os.getenv("ORDER_EVENT_COALESCE_WINDOW", 0.1))
+    ORDER_EVENT_COALESCE_MAX = int(os.getenv("ORDER_EVENT_COALESCE_MAX", 100))         # event per batch
+
+    # keranjang kasir di server: kadaluarsa sekian jam setelah terakhir diubah
+    CART_TTL_HOURS = float(os.getenv("CART_TTL_HOURS", 12))
+    # berapa lama (detik) kunci checkout → order disimpan di memori; setelahnya dicek ke database
+    CHECKOUT_IDEMPOTENCY_TTL = int(os.getenv("CHECKOUT_IDEMPOTENCY_TTL", 600))
+
+    # SSE (/kitchen/stream, /waiter/stream) untuk layar tanpa Socket.IO.
+    # Jalankan dengan worker async (eventlet/gevent) supaya koneksi idle tidak memakan thread.
+    SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", 1.0))          # detik antar cek order_event
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15))  # detik tanpa event → ping
+    SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", 3000))                     # jeda reconnect browser
+    SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", 1000))                 # event tertahan per client
+    SSE_GAP_GRACE = float(os.getenv("SSE_GAP_GRACE", 5))                    # detik menunggu id order_event yang belum commit
@@ -0,0 +1,46 @@
+"""add station to ticket_time_by_hour key
+
+Revision ID: 6c2d9f4e8a17
+Revises: 0b6e9d4a7c15
+Create Date: 2025-10-18 09:12:40.551093
+
+ticket_time_by_hour hanya rollup (bisa dibangun ulang dari timestamp order_item), jadi tabelnya
+dibuat ulang dengan station di primary key. Setelah upgrade jalankan: flask rollup ticket-times
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2d9f4e8a17'
+down_revision = '0b6e9d4a7c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_table('ticket_time_by_hour')
+    op.create_table('ticket_time_by_hour',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('station', sa.String(length=20), nullable=False),
+    sa.Column('stage', sa.String(length=20), nullable=False),
+    sa.Column('bin', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.PrimaryKeyConstraint('bucket', 'menu_item_id', 'station', 'stage', 'bin')
+    )
+
+
+def downgrade():
+    op.drop_table('ticket_time_by_hour')
+    op.create_table('ticket_time_by_hour',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.String(length=20), nullable=False),
+    sa.Column('bin', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.PrimaryKeyConstraint('bucket', 'menu_item_id', 'stage', 'bin')
+    )
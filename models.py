@@ -31,6 +31,7 @@ class MenuItem(db.Model):
     price = db.Column(db.Float, nullable=False)
     image = db.Column(db.String(255))
     is_active = db.Column(db.Boolean, default=True)
+    station = db.Column(db.String(20), nullable=True)  # station dapur (services/stations.py), None = umum
 
 
 # ===============================
@@ -47,8 +48,12 @@ class Order(db.Model):
     # status: "on progress", "open", "served", "closed"
     amount_paid = db.Column(db.Integer, nullable=True)
     change_due = db.Column(db.Integer, nullable=True)
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    created_at = db.Column(db.DateTime, default=db.func.now(), index=True)
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+    # jumlah item yang belum diantar; order ditutup saat mencapai 0 (lihat services/order_state.py)
+    open_items = db.Column(db.Integer, nullable=False, default=0)
+    # kunci dari form checkout; checkout ulang dengan kunci yang sama mengembalikan order ini
+    idempotency_key = db.Column(db.String(64), nullable=True, unique=True, index=True)
     
     items = db.relationship("OrderItem", backref="order", lazy=True)
 
@@ -57,19 +62,62 @@ class Order(db.Model):
 # ORDER ITEM MODEL
 # ===============================
 class OrderItem(db.Model):
+    __table_args__ = (
+        # antrean per station dapur: WHERE status IN (...) AND station = ...
+        db.Index("ix_order_item_status_station", "status", "station"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
-    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False, index=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id"), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)  # harga saat transaksi (biar ga ikut berubah kalau harga menu berubah)
     status = db.Column(db.String(20), default="pending")  
     # status: "pending", "cooking", "ready", "delivered"
     notes = db.Column(db.Text, nullable=True)  # catatan tambahan (misal: pedas, tanpa es)
+    station = db.Column(db.String(20), nullable=True)  # salinan MenuItem.station saat checkout
+    # waktu tiap transisi status (lihat services/order_state.py); waktu checkout = order.created_at
+    cooking_at = db.Column(db.DateTime, nullable=True)
+    ready_at = db.Column(db.DateTime, nullable=True)
+    delivered_at = db.Column(db.DateTime, nullable=True)
 
     menu_item = db.relationship("MenuItem", backref="order_items")
 
 
 
+# ===============================
+# KERANJANG KASIR (disimpan di server, cookie hanya berisi cart_id)
+# ===============================
+class Cart(db.Model):
+    __tablename__ = "cart"
+
+    id = db.Column(db.String(32), primary_key=True)  # token acak, disimpan di session["cart_id"]
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # diperpanjang setiap kali diubah
+
+
+class CartItem(db.Model):
+    __tablename__ = "cart_item"
+
+    cart_id = db.Column(db.String(32), db.ForeignKey("cart.id"), primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id"), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    note = db.Column(db.String(255), nullable=False, default="")
+    added_at = db.Column(db.DateTime, nullable=False, default=datetime.now)  # urutan tampil di keranjang
+
+
+# ===============================
+# VERSI KATALOG MENU
+# ===============================
+class CatalogVersion(db.Model):
+    """Satu baris (id=1) yang versinya dinaikkan setiap kali menu berubah; dipoll oleh cache katalog tiap proses."""
+    __tablename__ = "catalog_version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+
 # ===============================
 # FEEDBACK MODEL
 # ===============================
@@ -83,4 +131,74 @@ class Feedback(db.Model):
     message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    order = db.relationship("Order", backref="feedbacks")
\ No newline at end of file
+    order = db.relationship("Order", backref="feedbacks")
+
+# ===============================
+# ROLLUP PENJUALAN PER JAM
+# ===============================
+class SalesByHour(db.Model):
+    __tablename__ = "sales_by_hour"
+
+    bucket = db.Column(db.DateTime, primary_key=True)  # awal jam (menit & detik = 0)
+    total_sales = db.Column(db.Integer, nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class MenuQtyByHour(db.Model):
+    __tablename__ = "menu_qty_by_hour"
+
+    bucket = db.Column(db.DateTime, primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id"), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)  # quantity x harga saat transaksi
+
+
+class TicketTimeByHour(db.Model):
+    """
+    Histogram waktu tiket per jam: berapa item yang mencapai `stage` dalam rentang waktu `bin`
+    sejak checkout. Persentil (p50/p95/p99) dihitung dari sini, bukan dari histori order_item.
+    `station` = station item saat checkout (order_item.station), bukan station menu saat ini.
+    """
+    __tablename__ = "ticket_time_by_hour"
+
+    bucket = db.Column(db.DateTime, primary_key=True)  # jam transisi terjadi
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id"), primary_key=True)
+    station = db.Column(db.String(20), primary_key=True, default="")  # "" = umum (tanpa station)
+    stage = db.Column(db.String(20), primary_key=True)  # "cooking", "ready", "delivered"
+    bin = db.Column(db.Integer, primary_key=True)       # index TICKET_TIME_BINS (services/rollup.py)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# ===============================
+# OUTBOX PESAN WHATSAPP
+# ===============================
+class WhatsAppOutbox(db.Model):
+    __tablename__ = "whatsapp_outbox"
+    __table_args__ = (
+        db.Index("ix_whatsapp_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=True)
+    phone = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    # status: "pending", "sending", "sent", "dead"
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+# ===============================
+# EVENT STATUS ORDER (untuk resync layar dapur/waiter)
+# ===============================
+class OrderEvent(db.Model):
+    __tablename__ = "order_event"
+
+    id = db.Column(db.Integer, primary_key=True)  # nomor urut event (seq), selalu naik
+    order_id = db.Column(db.Integer, nullable=False)
+    rooms = db.Column(db.String(255), nullable=False)  # room tujuan, format ",kitchen,waiter,order-5,"
+    payload = db.Column(db.Text, nullable=False)       # JSON yang sama dengan event socket
+    created_at = db.Column(db.DateTime, default=datetime.now)
@@ -0,0 +1,65 @@
+import threading
+import time
+from datetime import datetime
+
+
+class ResultCache:
+    """
+    Cache hasil komputasi di memori proses.
+    - setiap entri punya TTL
+    - invalidate() menaikkan versi sehingga semua entri lama tidak dipakai lagi
+    - single-flight: N request yang miss bersamaan hanya memicu 1 komputasi,
+      sisanya menunggu hasil dari komputasi tersebut
+    """
+
+    def __init__(self, wait_timeout: float = 30.0):
+        self._lock = threading.Lock()
+        self._entries = {}    # key -> (expires_at, version, value)
+        self._inflight = {}   # key -> threading.Event
+        self._version = 0
+        self._wait_timeout = wait_timeout
+        self.last_modified = datetime.utcnow().replace(microsecond=0)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Tandai semua entri kadaluarsa (dipanggil setelah ada data yang berubah)."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self.last_modified = datetime.utcnow().replace(microsecond=0)
+
+    def get_or_compute(self, key, compute, ttl: float):
+        if ttl <= 0:
+            return compute()
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic() and entry[1] == self._version:
+                    return entry[2]
+
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight[key] = threading.Event()
+                    version = self._version
+
+            if not leader:
+                # tunggu komputasi yang sedang berjalan, lalu cek ulang cache
+                event.wait(self._wait_timeout)
+                continue
+
+            try:
+                value = compute()
+                with self._lock:
+                    # jangan simpan hasil yang dihitung sebelum invalidasi
+                    if version == self._version:
+                        self._entries[key] = (time.monotonic() + ttl, version, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
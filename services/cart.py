@@ -0,0 +1,134 @@
+import secrets
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from flask import current_app, session
+from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Cart, CartItem
+
+MAX_NOTE_LENGTH = 255
+
+
+class CartLine(NamedTuple):
+    menu_item_id: int
+    qty: int
+    note: str
+
+
+# ========================
+# KERANJANG KASIR DI SERVER
+# ========================
+# Cookie session hanya membawa session["cart_id"]; isi keranjang ada di tabel cart_item
+# (satu baris per menu). Setiap perubahan satu baris = satu UPDATE/INSERT atomik,
+# jadi tidak ada baca-ubah-tulis seluruh keranjang. Fungsi di sini tidak commit.
+def _expiry() -> datetime:
+    return datetime.now() + timedelta(hours=current_app.config["CART_TTL_HOURS"])
+
+
+def current_cart_id(create: bool = False) -> Optional[str]:
+    """
+    cart_id milik user yang login (dari cookie). Keranjang yang sudah kadaluarsa atau milik user lain
+    dianggap tidak ada; dengan create=True dibuatkan keranjang baru.
+    """
+    cart_id = session.get("cart_id")
+    if cart_id:
+        valid = db.session.execute(
+            select(Cart.id).where(Cart.id == cart_id, Cart.user_id == current_user.id,
+                                  Cart.expires_at > datetime.now())
+        ).scalar()
+        if valid:
+            return cart_id
+    if not create:
+        return None
+
+    purge_expired_carts()
+    cart_id = secrets.token_hex(16)
+    db.session.add(Cart(id=cart_id, user_id=current_user.id, expires_at=_expiry()))
+    db.session.flush()
+    session["cart_id"] = cart_id
+    return cart_id
+
+
+def cart_lines(cart_id: Optional[str]) -> list:
+    """Isi keranjang sebagai list CartLine (urut waktu ditambahkan); kosong kalau cart_id None."""
+    if not cart_id:
+        return []
+    rows = db.session.execute(
+        select(CartItem.menu_item_id, CartItem.quantity, CartItem.note)
+        .where(CartItem.cart_id == cart_id)
+        .order_by(CartItem.added_at, CartItem.menu_item_id)
+    )
+    return [CartLine(menu_item_id, quantity, note or "") for menu_item_id, quantity, note in rows]
+
+
+def _line_filter(cart_id: str, menu_item_id: int):
+    table = CartItem.__table__
+    return table.c.cart_id == cart_id, table.c.menu_item_id == menu_item_id
+
+
+def _touch(cart_id: str) -> None:
+    db.session.execute(Cart.__table__.update().where(Cart.id == cart_id).values(expires_at=_expiry()))
+
+
+def _insert_or(cart_id: str, menu_item_id: int, values: dict, fallback) -> None:
+    """INSERT baris baru; kalau kalah balapan dengan request lain (baris sudah ada) → jalankan fallback."""
+    try:
+        with db.session.begin_nested():
+            db.session.execute(CartItem.__table__.insert().values(
+                cart_id=cart_id, menu_item_id=menu_item_id, added_at=datetime.now(), **values
+            ))
+    except IntegrityError:
+        db.session.execute(fallback)
+
+
+def add_line(cart_id: str, menu_item_id: int, qty: int) -> None:
+    """Tambah qty ke satu menu (UPDATE quantity = quantity + n, atau INSERT kalau belum ada)."""
+    table = CartItem.__table__
+    stmt = table.update().where(*_line_filter(cart_id, menu_item_id)).values(quantity=table.c.quantity + qty)
+    if not db.session.execute(stmt).rowcount:
+        _insert_or(cart_id, menu_item_id, {"quantity": qty, "note": ""}, stmt)
+    _touch(cart_id)
+
+
+def set_line(cart_id: str, menu_item_id: int, qty: int, note: str = None) -> None:
+    """Set qty (dan catatan kalau diisi) satu menu; qty <= 0 menghapus baris."""
+    if qty <= 0:
+        remove_line(cart_id, menu_item_id)
+        return
+    values = {"quantity": qty}
+    if note is not None:
+        values["note"] = note.strip()[:MAX_NOTE_LENGTH]
+    stmt = CartItem.__table__.update().where(*_line_filter(cart_id, menu_item_id)).values(values)
+    if not db.session.execute(stmt).rowcount:
+        _insert_or(cart_id, menu_item_id, {"note": "", **values}, stmt)
+    _touch(cart_id)
+
+
+def remove_line(cart_id: str, menu_item_id: int) -> None:
+    db.session.execute(CartItem.__table__.delete().where(*_line_filter(cart_id, menu_item_id)))
+    _touch(cart_id)
+
+
+def clear_cart(cart_id: Optional[str]) -> None:
+    """Hapus keranjang beserta isinya (setelah checkout)."""
+    if cart_id:
+        db.session.execute(CartItem.__table__.delete().where(CartItem.cart_id == cart_id))
+        db.session.execute(Cart.__table__.delete().where(Cart.id == cart_id))
+    session.pop("cart_id", None)
+
+
+def remove_menu_from_carts(menu_item_id: int) -> None:
+    """Hapus menu dari semua keranjang (sebelum menu dihapus; FK cart_item.menu_item_id)."""
+    db.session.execute(CartItem.__table__.delete().where(CartItem.menu_item_id == menu_item_id))
+
+
+def purge_expired_carts() -> None:
+    """Hapus keranjang yang sudah kadaluarsa (dipanggil saat membuat keranjang baru; index expires_at)."""
+    # satu batas waktu untuk kedua DELETE: keranjang yang kadaluarsa di antara keduanya
+    # tidak boleh terhapus sementara item-nya masih ada (FK cart_item.cart_id)
+    cutoff = datetime.now()
+    expired = select(Cart.id).where(Cart.expires_at <= cutoff)
+    db.session.execute(CartItem.__table__.delete().where(CartItem.cart_id.in_(expired)))
+    db.session.execute(Cart.__table__.delete().where(Cart.expires_at <= cutoff))
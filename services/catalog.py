@@ -0,0 +1,123 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from flask import current_app
+from extensions import db
+from models import MenuItem, CatalogVersion
+from sqlalchemy import select
+
+CATALOG_ROW_ID = 1
+
+
+class MenuEntry(NamedTuple):
+    """Salinan read-only satu MenuItem; atributnya sama sehingga bisa langsung dipakai template."""
+    id: int
+    name: str
+    description: Optional[str]
+    price: float
+    image: Optional[str]
+    is_active: bool
+    station: Optional[str]
+
+
+class CatalogSnapshot:
+    """
+    Snapshot katalog menu yang tidak pernah diubah setelah dibuat.
+    Request memegang referensi snapshot-nya sendiri; reload hanya mengganti referensi global.
+    """
+
+    def __init__(self, version: int, entries):
+        self.version = version
+        self.items = tuple(entries)                              # semua menu, urut id
+        self.active = tuple(e for e in self.items if e.is_active)
+        self._by_id = MappingProxyType({e.id: e for e in self.items})
+
+    def get(self, menu_id) -> Optional[MenuEntry]:
+        try:
+            return self._by_id.get(int(menu_id))
+        except (TypeError, ValueError):
+            return None
+
+    def __len__(self):
+        return len(self.items)
+
+
+class CatalogCache:
+    """
+    Cache katalog per proses.
+    - versi katalog disimpan di tabel catalog_version (1 baris) dan dinaikkan oleh admin
+    - setiap proses mengecek versi paling sering tiap CATALOG_POLL_INTERVAL detik (1 query kecil);
+      di antara pengecekan, katalog dibaca tanpa query sama sekali
+    - kalau versi berubah, semua menu di-load ulang (1 query) menjadi snapshot baru
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        """Paksa cek versi di akses berikutnya (dipanggil setelah commit perubahan menu di proses ini)."""
+        self._checked_at = 0.0
+
+    def get(self) -> CatalogSnapshot:
+        interval = current_app.config.get("CATALOG_POLL_INTERVAL", 0)
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+
+        with self._lock:
+            # thread lain mungkin sudah me-refresh selagi kita menunggu lock
+            if self._snapshot is not None and time.monotonic() - self._checked_at < interval:
+                return self._snapshot
+            version = _current_version()
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = _load_snapshot(version)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+
+def _current_version() -> int:
+    version = db.session.execute(
+        select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_ROW_ID)
+    ).scalar()
+    return version or 0
+
+
+def _load_snapshot(version: int) -> CatalogSnapshot:
+    rows = db.session.execute(
+        select(MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price,
+               MenuItem.image, MenuItem.is_active, MenuItem.station)
+        .order_by(MenuItem.id)
+    )
+    return CatalogSnapshot(version, (
+        MenuEntry(id, name, description, price, image, bool(is_active), station)
+        for id, name, description, price, image, is_active, station in rows
+    ))
+
+
+catalog_cache = CatalogCache()
+
+
+def get_catalog() -> CatalogSnapshot:
+    return catalog_cache.get()
+
+
+def bump_catalog_version() -> None:
+    """
+    Naikkan versi katalog di transaksi yang sedang berjalan (panggil sebelum commit perubahan menu),
+    lalu invalidate_catalog() setelah commit.
+    """
+    table = CatalogVersion.__table__
+    updated = db.session.execute(
+        table.update()
+        .where(table.c.id == CATALOG_ROW_ID)
+        .values(version=table.c.version + 1)
+    ).rowcount
+    if not updated:
+        db.session.add(CatalogVersion(id=CATALOG_ROW_ID, version=1))
+
+
+def invalidate_catalog() -> None:
+    catalog_cache.invalidate()
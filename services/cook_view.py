@@ -0,0 +1,62 @@
+from sqlalchemy import select, func
+from extensions import db
+from models import OrderItem
+from services.realtime import menu_name
+
+# ========================
+# TAMPILAN MASAK (item sama digabung)
+# ========================
+# Status yang tampil di tampilan masak (sama dengan layar dapur)
+COOK_STATUSES = ("open", "cooking")
+
+
+def notes_key(column):
+    """Catatan yang dinormalisasi di SQL: "  Pedas " dan "pedas" masuk grup yang sama."""
+    return func.lower(func.trim(func.coalesce(column, "")))
+
+
+def cook_groups(station=None) -> list:
+    """
+    Item yang belum selesai digabung per (menu, catatan, status) dalam satu query agregat.
+    Return list dict, urut dari grup yang berisi item paling lama.
+    """
+    key = notes_key(OrderItem.notes).label("notes")
+    query = (
+        select(
+            OrderItem.menu_item_id, key, OrderItem.status,
+            func.sum(OrderItem.quantity).label("quantity"),
+            func.count(OrderItem.id).label("items"),
+            func.count(func.distinct(OrderItem.order_id)).label("orders"),
+            func.min(OrderItem.id).label("oldest"),
+        )
+        .where(OrderItem.status.in_(COOK_STATUSES))
+        .group_by(OrderItem.menu_item_id, key, OrderItem.status)
+        .order_by(func.min(OrderItem.id))
+    )
+    if station:
+        query = query.where(OrderItem.station == station)
+
+    return [
+        {
+            "menu_item_id": row.menu_item_id,
+            "menu_name": menu_name(row.menu_item_id),
+            "notes": row.notes,
+            "status": row.status,
+            "quantity": int(row.quantity or 0),
+            "items": row.items,
+            "orders": row.orders,
+        }
+        for row in db.session.execute(query)
+    ]
+
+
+def group_item_ids(menu_item_id: int, notes: str, status: str, station=None) -> list:
+    """Id item yang termasuk satu grup tampilan masak (dipakai aksi "tandai satu grup")."""
+    query = select(OrderItem.id).where(
+        OrderItem.menu_item_id == menu_item_id,
+        OrderItem.status == status,
+        notes_key(OrderItem.notes) == (notes or "").strip().lower(),
+    )
+    if station:
+        query = query.where(OrderItem.station == station)
+    return list(db.session.execute(query.order_by(OrderItem.id)).scalars())
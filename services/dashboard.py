@@ -0,0 +1,264 @@
+from flask import current_app
+from extensions import db
+from models import MenuItem, User, Feedback, SalesByHour, MenuQtyByHour
+from datetime import datetime, timedelta
+from sqlalchemy import func, extract, case, select
+from calendar import month_abbr
+from services.cache import ResultCache
+from services.periods import period_range, in_range
+
+# Periode tab di dashboard (Tahun / Bulan / Minggu / Hari Ini) → nama periode di services/periods.py
+PERIOD_RANGES = {
+    "year": "this_year",
+    "month": "this_month",
+    "week": "last_7_days",
+    "day": "today",
+}
+PERIODS = tuple(PERIOD_RANGES)
+
+# Jumlah query SQL per widget. Semua widget hanya membaca tabel rollup
+# (lihat services/rollup.py) dan tabel kecil user/menu/feedback. Dijaga oleh tests/test_dashboard.py.
+WIDGET_QUERY_COUNT = {
+    "sales": 1,   # sales_by_hour, digroup sesuai periode
+    "menu": 1,    # menu_qty_by_hour JOIN menu_item, digroup per nama menu
+    "peak": 1,    # sales_by_hour, digroup per jam
+    "growth": 4,  # ringkasan, penjualan bulan ini vs bulan lalu, menu, jam ramai bulan ini
+}
+
+# Cache hasil widget (TTL: config DASHBOARD_CACHE_TTL, detik).
+# Dikosongkan oleh invalidate_dashboard() setiap kali ada data order/feedback yang berubah.
+dashboard_cache = ResultCache()
+
+
+def invalidate_dashboard():
+    dashboard_cache.invalidate()
+
+
+def get_widget(widget, period=None):
+    """Data widget dari cache; hanya dihitung ulang saat kadaluarsa atau setelah invalidasi."""
+    ttl = current_app.config.get("DASHBOARD_CACHE_TTL", 0)
+    compute = WIDGETS[widget]
+    args = () if period is None else (period,)
+    return dashboard_cache.get_or_compute((widget, period), lambda: compute(*args), ttl)
+
+
+def _growth(current, previous):
+    return ((current - previous) / previous * 100) if previous > 0 else 0
+
+
+def _range(period, now=None):
+    """Rentang [awal, akhir) untuk tab dashboard."""
+    return period_range(PERIOD_RANGES[period], now)
+
+
+# ========================
+# WIDGET: GRAFIK PENJUALAN & PESANAN
+# ========================
+def sales_series(period, now=None):
+    """
+    year  → total per tahun (seluruh histori)
+    month → total per bulan tahun berjalan
+    week  → total per hari, 7 hari terakhir
+    day   → total hari ini
+    """
+    sales = func.sum(SalesByHour.total_sales)
+    orders = func.sum(SalesByHour.order_count)
+
+    if period == "year":
+        year = extract("year", SalesByHour.bucket).label("year")
+        rows = db.session.query(year, sales, orders).group_by(year).order_by(year).all()
+        labels = [int(y) for y, _, _ in rows]
+        sales_data = [int(s or 0) for _, s, _ in rows]
+        orders_data = [int(o or 0) for _, _, o in rows]
+
+    elif period == "month":
+        month = extract("month", SalesByHour.bucket).label("month")
+        rows = (
+            db.session.query(month, sales, orders)
+            .filter(*in_range(SalesByHour.bucket, *_range("year", now)))
+            .group_by(month)
+            .all()
+        )
+        labels = [month_abbr[m] for m in range(1, 13)]
+        sales_data, orders_data = [0] * 12, [0] * 12
+        for m, s, o in rows:
+            sales_data[int(m) - 1] = int(s or 0)
+            orders_data[int(m) - 1] = int(o or 0)
+
+    elif period == "week":
+        start, end = _range("week", now)
+        rows = (
+            db.session.query(SalesByHour.bucket, SalesByHour.total_sales, SalesByHour.order_count)
+            .filter(*in_range(SalesByHour.bucket, start, end))
+            .all()
+        )
+        days = [(start + timedelta(days=i)).date() for i in range(7)]
+        labels = [d.strftime("%a") for d in days]
+        sales_data, orders_data = [0] * 7, [0] * 7
+        for bucket, s, o in rows:
+            i = days.index(bucket.date())
+            sales_data[i] += int(s or 0)
+            orders_data[i] += int(o or 0)
+
+    else:
+        s, o = (
+            db.session.query(sales, orders)
+            .filter(*in_range(SalesByHour.bucket, *_range("day", now)))
+            .one()
+        )
+        labels = ["Hari Ini"]
+        sales_data, orders_data = [int(s or 0)], [int(o or 0)]
+
+    return {
+        "labels": labels,
+        "sales": sales_data,
+        "orders": orders_data,
+        "total_sales": sum(sales_data),
+        "total_orders": sum(orders_data),
+    }
+
+
+# ========================
+# WIDGET: DISTRIBUSI MENU TERJUAL
+# ========================
+def menu_distribution(period, now=None):
+    total_qty = func.sum(MenuQtyByHour.quantity)
+    rows = (
+        db.session.query(MenuItem.name, total_qty.label("total_qty"))
+        .join(MenuItem, MenuQtyByHour.menu_item_id == MenuItem.id)
+        .filter(*in_range(MenuQtyByHour.bucket, *_range(period, now)))
+        .group_by(MenuItem.name)
+        .order_by(total_qty.desc())
+        .all()
+    )
+    rows = [r for r in rows if r.total_qty]
+    return {
+        "labels": [r.name for r in rows],
+        "counts": [int(r.total_qty) for r in rows],
+    }
+
+
+# ========================
+# WIDGET: JAM RAMAI
+# ========================
+def peak_hours(period, now=None):
+    hour = extract("hour", SalesByHour.bucket).label("hour")
+    rows = (
+        db.session.query(hour, func.sum(SalesByHour.order_count))
+        .filter(*in_range(SalesByHour.bucket, *_range(period, now)))
+        .group_by(hour)
+        .all()
+    )
+    hours = [0] * 24
+    for h, c in rows:
+        hours[int(h)] = int(c or 0)
+    peak = max(hours)
+    return {
+        "hours": hours,
+        "peak_hour": f"{hours.index(peak):02d}:00" if peak else "-",
+    }
+
+
+# ========================
+# WIDGET: KPI & PERTUMBUHAN (bulan ini vs bulan lalu)
+# ========================
+def growth_kpis(now=None):
+    now = now or datetime.now()
+    month_start, next_month_start = period_range("this_month", now)
+    last_month_start, _ = period_range("last_month", now)
+
+    # === 1. Ringkasan ===
+    total_users, total_menu, avg_rating = db.session.execute(
+        select(
+            select(func.count(User.id)).scalar_subquery(),
+            select(func.count(MenuItem.id)).scalar_subquery(),
+            select(func.avg(Feedback.rating)).scalar_subquery(),
+        )
+    ).one()
+
+    # === 2. Penjualan bulan ini vs bulan lalu ===
+    this_month = SalesByHour.bucket >= month_start
+    this_month_sales, this_month_orders, last_month_sales, last_month_orders = (
+        db.session.query(
+            func.sum(case((this_month, SalesByHour.total_sales), else_=0)),
+            func.sum(case((this_month, SalesByHour.order_count), else_=0)),
+            func.sum(case((~this_month, SalesByHour.total_sales), else_=0)),
+            func.sum(case((~this_month, SalesByHour.order_count), else_=0)),
+        )
+        .filter(*in_range(SalesByHour.bucket, last_month_start, next_month_start))
+        .one()
+    )
+    this_month_sales, this_month_orders = int(this_month_sales or 0), int(this_month_orders or 0)
+    last_month_sales, last_month_orders = int(last_month_sales or 0), int(last_month_orders or 0)
+    this_month_avg_order = this_month_sales / this_month_orders if this_month_orders else 0
+    last_month_avg_order = last_month_sales / last_month_orders if last_month_orders else 0
+
+    sales_growth = _growth(this_month_sales, last_month_sales)
+    orders_growth = _growth(this_month_orders, last_month_orders)
+    avg_order_growth = _growth(this_month_avg_order, last_month_avg_order)
+
+    # === 3. Menu terlaris & pendapatan tertinggi ===
+    in_month = (MenuQtyByHour.bucket >= month_start) & (MenuQtyByHour.bucket < next_month_start)
+    menu_data = (
+        db.session.query(
+            MenuItem.name,
+            func.sum(MenuQtyByHour.revenue).label("revenue"),
+            func.sum(case((in_month, MenuQtyByHour.quantity), else_=0)).label("month_qty"),
+            func.sum(case((in_month, MenuQtyByHour.revenue), else_=0)).label("month_revenue"),
+        )
+        .join(MenuItem, MenuQtyByHour.menu_item_id == MenuItem.id)
+        .group_by(MenuItem.name)
+        .all()
+    )
+    top_menu_month = max(menu_data, key=lambda m: m.month_qty or 0, default=None)
+    if top_menu_month is not None and not top_menu_month.month_qty:
+        top_menu_month = None
+    top_revenue_menu = max(menu_data, key=lambda m: m.revenue or 0, default=None)
+    top_revenue_menu_name = top_revenue_menu.name if top_revenue_menu else "Belum ada data"
+    top_revenue_amount = top_revenue_menu.revenue if top_revenue_menu else 0
+    total_revenue_month = sum(m.month_revenue or 0 for m in menu_data)
+    top_menu_profit_percentage = (
+        (top_revenue_amount / total_revenue_month * 100) if total_revenue_month > 0 else 0
+    )
+
+    # === 4. Jam ramai bulan ini ===
+    peak_hour = peak_hours("month", now)["peak_hour"]
+
+    # === Insight Cepat (teks otomatis) ===
+    status_text = "meningkat" if sales_growth >= 0 else "menurun"
+    status_color = "text-success" if sales_growth >= 0 else "text-danger"
+
+    insight_text = (
+        f"Menu paling menguntungkan bulan ini: <strong>{top_revenue_menu_name}</strong> "
+        f"(<strong>{top_menu_profit_percentage:.1f}%</strong> dari total pendapatan bulan ini) | "
+        f"Penjualan <strong class='{status_color}'>{status_text}</strong> "
+        f"<strong class='{status_color}'>{abs(sales_growth):.1f}%</strong> dibanding bulan lalu | "
+        f"Puncak pesanan terjadi pukul <strong>{peak_hour or '-'}</strong>"
+    )
+
+    return {
+        "total_sales": this_month_sales,
+        "total_orders": this_month_orders,
+        "avg_order_value": this_month_avg_order,
+        "sales_growth": sales_growth,
+        "orders_growth": orders_growth,
+        "avg_order_growth": avg_order_growth,
+        "total_users": total_users,
+        "total_menu": total_menu,
+        "avg_rating": float(avg_rating or 0),
+        "peak_hour": peak_hour,
+        "top_menu_name": top_menu_month.name if top_menu_month else None,
+        "top_menu_qty": int(top_menu_month.month_qty) if top_menu_month else 0,
+        "top_revenue_menu_name": top_revenue_menu_name,
+        "top_revenue_amount": float(top_revenue_amount or 0),
+        "top_menu_profit_percentage": top_menu_profit_percentage,
+        "insight_text": insight_text,
+    }
+
+
+WIDGETS = {
+    "sales": sales_series,
+    "menu": menu_distribution,
+    "peak": peak_hours,
+    "growth": growth_kpis,
+}
@@ -0,0 +1,195 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from flask import Response, current_app, request
+from sqlalchemy import select
+from extensions import db, socketio
+from models import OrderEvent
+from services.realtime import latest_seq, order_changes, scope_event
+
+# ========================
+# SERVER-SENT EVENTS (cadangan Socket.IO untuk tablet lama)
+# ========================
+# Semua koneksi SSE di satu proses dilayani satu poller tabel order_event:
+# - 1 query per SSE_POLL_INTERVAL detik, berapa pun jumlah client (client idle tidak menyentuh database)
+# - event dibaca dari tabel, jadi emit dari worker lain ikut sampai tanpa message queue
+# - queue & sleep memakai primitive Socket.IO (thread biasa, atau greenlet di mode eventlet/gevent),
+#   jadi di worker async client yang idle tidak memakan satu thread OS masing-masing
+POLL_BATCH = 500
+
+
+class _Subscriber:
+    def __init__(self, room: str, queue, max_size: int):
+        self.room_key = f",{room},"
+        self.queue = queue
+        self.max_size = max_size
+        self.lagging = False  # queue penuh → stream ditutup, client reconnect dengan Last-Event-ID
+
+
+class EventHub:
+    """Poller order_event per proses yang membagikan event baru ke subscriber SSE sesuai room."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._running = False
+        self._last_seq = 0
+
+    def subscribe(self, room: str, after_seq: int) -> _Subscriber:
+        """
+        Daftarkan client; event dengan seq > after_seq yang belum dikirim poller akan masuk ke queue-nya.
+        Panggil sebelum membaca backlog (order_changes) supaya tidak ada celah di antaranya.
+        """
+        subscriber = _Subscriber(room, socketio.server.eio.create_queue(),
+                                 current_app.config["SSE_QUEUE_SIZE"])
+        with self._lock:
+            self._subscribers.add(subscriber)
+            start = not self._running
+            if start:
+                self._running = True
+                self._last_seq = after_seq
+        if start:
+            socketio.start_background_task(self._poll, current_app._get_current_object())
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _poll(self, app) -> None:
+        interval = app.config["SSE_POLL_INTERVAL"]
+        grace = timedelta(seconds=app.config["SSE_GAP_GRACE"])
+        with app.app_context():
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._running = False  # berhenti sampai ada client baru
+                        return
+                try:
+                    more = self._poll_once(grace)
+                except Exception:
+                    app.logger.exception("Polling order_event untuk SSE gagal")
+                    db.session.rollback()
+                    more = False
+                if not more:
+                    socketio.sleep(interval)
+
+    def _poll_once(self, grace: timedelta) -> bool:
+        """Kirim event baru yang sudah pasti urutannya. Return True kalau masih ada sisa batch (langsung poll lagi)."""
+        rows = db.session.execute(
+            select(OrderEvent.id, OrderEvent.rooms, OrderEvent.payload, OrderEvent.created_at)
+            .where(OrderEvent.id > self._last_seq)
+            .order_by(OrderEvent.id)
+            .limit(POLL_BATCH)
+        ).all()
+        db.session.rollback()  # jangan tahan transaksi/snapshot database di antara polling
+        released = self._settled(rows, datetime.now() - grace)
+        if released:
+            self._dispatch(released)
+            self._last_seq = released[-1].id
+        return len(rows) == POLL_BATCH and len(released) == len(rows)
+
+    def _settled(self, rows, settled_before: datetime) -> list:
+        """
+        Awal `rows` yang boleh dikirim. Id event dibagikan saat INSERT tetapi baru terlihat saat commit,
+        jadi celah id bisa berarti transaksi yang belum commit: baris setelah celah ditahan (dibaca ulang
+        poll berikutnya) sampai celahnya terisi, atau sampai lebih tua dari SSE_GAP_GRACE (celah dianggap
+        rollback). Urutan kirim tetap naik, jadi client cukup membuang seq <= seq terakhirnya.
+        """
+        released = []
+        previous = self._last_seq
+        for row in rows:
+            if row.id != previous + 1 and row.created_at is not None and row.created_at > settled_before:
+                break
+            released.append(row)
+            previous = row.id
+        return released
+
+    def _dispatch(self, rows) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.lagging:
+                continue
+            for row in rows:
+                if subscriber.room_key not in row.rooms:
+                    continue
+                if subscriber.queue.qsize() >= subscriber.max_size:
+                    subscriber.lagging = True
+                    subscriber.queue.put(None)  # bangunkan stream supaya ditutup
+                    break
+                subscriber.queue.put((row.id, row.payload))
+
+
+event_hub = EventHub()
+
+
+def _message(data: dict, seq: int = None, event: str = "order_update") -> str:
+    lines = [f"event: {event}"]
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def _resume_seq():
+    """Last-Event-ID (dikirim browser saat reconnect otomatis) atau ?since= (koneksi pertama)."""
+    for value in (request.headers.get("Last-Event-ID"), request.args.get("since")):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def order_event_stream(room: str, snapshot) -> Response:
+    """
+    Response text/event-stream berisi "order_update" (payload & seq sama dengan event socket) untuk satu room.
+    - backlog sejak Last-Event-ID / ?since= dikirim dulu (atau event "snapshot" kalau sudah terlalu jauh)
+    - komentar heartbeat tiap SSE_HEARTBEAT_INTERVAL detik supaya proxy tidak memutus koneksi idle
+    Database hanya disentuh sebelum streaming dimulai; selama streaming client cukup menunggu queue.
+    """
+    config = current_app.config
+    heartbeat = config["SSE_HEARTBEAT_INTERVAL"]
+    since = _resume_seq()
+
+    subscriber = event_hub.subscribe(room, latest_seq())
+    changes = order_changes(room, since, snapshot)
+    db.session.remove()  # koneksi database dikembalikan ke pool sebelum stream berjalan lama
+    empty = socketio.server.eio.get_queue_empty_exception()
+
+    def generate():
+        last_seq = changes["seq"]
+        try:
+            yield f"retry: {config['SSE_RETRY_MS']}\n\n"
+            if changes["mode"] == "snapshot":
+                yield _message({"items": changes["items"]}, changes["seq"], event="snapshot")
+            else:
+                for event in changes["events"]:
+                    yield _message(event, event["seq"])
+                if not changes["events"]:
+                    yield f"id: {last_seq}\n\n"  # Last-Event-ID tetap benar walau belum ada event baru
+
+            while True:
+                try:
+                    item = subscriber.queue.get(timeout=heartbeat)
+                except empty:
+                    yield ": ping\n\n"
+                    continue
+                if item is None or subscriber.lagging:
+                    return  # client reconnect dengan Last-Event-ID → delta/snapshot
+                seq, payload = item
+                if seq <= last_seq:
+                    continue  # sudah terkirim lewat backlog
+                last_seq = seq
+                event = scope_event({**json.loads(payload), "seq": seq}, room)
+                if event is not None:
+                    yield _message(event, seq)
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.call_on_close(lambda: event_hub.unsubscribe(subscriber))  # juga kalau stream tidak sempat dimulai
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # nginx: jangan buffer stream
+    return response
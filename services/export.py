@@ -0,0 +1,72 @@
+import csv
+import io
+from extensions import db
+from models import Order, OrderItem, MenuItem
+from sqlalchemy import select
+from services.periods import in_range
+
+# Jumlah baris yang diambil per batch dari cursor database (server-side cursor)
+EXPORT_BATCH_SIZE = 1000
+# Awalan sel yang dibaca spreadsheet sebagai formula (CSV/formula injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+EXPORT_COLUMNS = [
+    ("order_id", Order.id),
+    ("created_at", Order.created_at),
+    ("customer_name", Order.customer_name),
+    ("customer_phone", Order.customer_phone),
+    ("order_status", Order.status),
+    ("payment_method", Order.payment_method),
+    ("total", Order.total),
+    ("amount_paid", Order.amount_paid),
+    ("change_due", Order.change_due),
+    ("item_id", OrderItem.id),
+    ("menu_name", MenuItem.name),
+    ("quantity", OrderItem.quantity),
+    ("price", OrderItem.price),
+    ("notes", OrderItem.notes),
+    ("item_status", OrderItem.status),
+]
+
+
+def iter_order_rows(start=None, end=None):
+    """
+    Baris order + item dalam rentang [start, end), dibaca bertahap tanpa memuat semuanya ke memori.
+    Outer join: order tanpa item tetap muncul (satu baris dengan kolom item kosong).
+    """
+    stmt = (
+        select(*(col for _, col in EXPORT_COLUMNS))
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+        .where(*in_range(Order.created_at, start, end))
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    yield from db.session.execute(stmt)
+
+
+def csv_safe(value):
+    """Teks yang diawali karakter formula diberi awalan ' supaya tidak dieksekusi spreadsheet."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_order_csv(start=None, end=None):
+    """Generator CSV (per batch) untuk response streaming."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
+
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for i, row in enumerate(iter_order_rows(start, end), start=1):
+        writer.writerow([csv_safe(value) for value in row])
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield flush()
+    yield flush()
@@ -0,0 +1,72 @@
+import re
+import threading
+import time
+import uuid
+from typing import Optional
+from flask import current_app, request
+from sqlalchemy import select
+from extensions import db
+from models import Order
+
+_KEY = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+# batas entri cache; entri kadaluarsa dibuang saat batas ini terlewati
+MAX_CACHED_KEYS = 10000
+
+
+class ExpiringKeyCache:
+    """Kunci → nilai dengan TTL di memori proses (hasil checkout terbaru, untuk replay tanpa query)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (expires_at, value)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key, value, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= MAX_CACHED_KEYS:
+                self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+            self._entries[key] = (now + ttl, value)
+
+
+checkout_cache = ExpiringKeyCache()
+
+
+def new_checkout_key() -> str:
+    """Kunci baru untuk form checkout (di-render sekali; tap ganda / retry mengirim kunci yang sama)."""
+    return uuid.uuid4().hex
+
+
+def checkout_key() -> Optional[str]:
+    """Header Idempotency-Key atau field form idempotency_key; None kalau kosong / formatnya salah."""
+    key = request.headers.get("Idempotency-Key") or request.form.get("idempotency_key")
+    key = (key or "").strip()
+    return key if _KEY.match(key) else None
+
+
+def find_checkout(key: Optional[str]) -> Optional[int]:
+    """Id order yang sudah dibuat dengan kunci ini: dari cache, lalu index unik order.idempotency_key."""
+    if not key:
+        return None
+    order_id = checkout_cache.get(key)
+    if order_id is None:
+        order_id = db.session.execute(select(Order.id).where(Order.idempotency_key == key)).scalar()
+        if order_id is not None:
+            remember_checkout(key, order_id)
+    return order_id
+
+
+def remember_checkout(key: Optional[str], order_id: int) -> None:
+    if key:
+        checkout_cache.put(key, order_id, current_app.config.get("CHECKOUT_IDEMPOTENCY_TTL", 0))
@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import NamedTuple
+from sqlalchemy import select, case
+from extensions import db
+from models import Order, OrderItem
+from services.rollup import TICKET_STAGES, record_ticket_times
+
+# ========================
+# STATE MACHINE ITEM & ORDER
+# ========================
+# Status tujuan item → status asal yang sah.
+# ("pending" = default kolom lama, diperlakukan sama dengan "open")
+ITEM_TRANSITIONS = {
+    "cooking": ("open", "pending"),
+    "ready": ("open", "pending", "cooking"),
+    "delivered": ("ready",),
+}
+# Order: open → pending (mulai dimasak) → close (semua item diantar)
+ORDER_OPEN = "open"
+ORDER_IN_PROGRESS = "pending"
+ORDER_CLOSED = "close"
+
+
+class InvalidTransition(Exception):
+    """Item tidak ada atau statusnya sudah berubah (misalnya ditekan dua kali / oleh orang lain)."""
+
+    def __init__(self, target, item_ids=None):
+        self.target = target
+        self.item_ids = item_ids
+        super().__init__(f"Item tidak bisa diubah ke status '{target}'")
+
+
+class ItemNotFound(InvalidTransition):
+    """Item dengan id tersebut tidak ada (bukan konflik status)."""
+
+    def __str__(self):
+        return "Item tidak ditemukan"
+
+
+class ItemChange(NamedTuple):
+    id: int
+    order_id: int
+    menu_item_id: int
+    quantity: int
+    station: str       # station dapur (None = umum)
+    status: str        # status item setelah transisi
+    order_status: str  # status order setelah transisi
+
+
+def _apply_order_effects(target: str, order_ids, per_order: dict) -> dict:
+    """
+    Efek transisi item ke order, dengan UPDATE bersyarat (tanpa baca-ubah-tulis di Python).
+    per_order: {order_id: jumlah item yang berubah}. Return {order_id: (status order terbaru, created_at)}.
+    """
+    table = Order.__table__
+    if target == "cooking":
+        db.session.execute(
+            table.update()
+            .where(table.c.id.in_(order_ids), table.c.status == ORDER_OPEN)
+            .values(status=ORDER_IN_PROGRESS)
+        )
+    elif target == "delivered":
+        # open_items dikurangi dan order ditutup di statement yang sama → cek penutupan O(1).
+        # status di-SET lebih dulu supaya memakai nilai open_items lama di semua database
+        # (MySQL mengevaluasi SET berurutan kiri ke kanan).
+        for order_id, count in per_order.items():
+            db.session.execute(
+                table.update()
+                .where(table.c.id == order_id)
+                .ordered_values(
+                    (table.c.status, case((table.c.open_items - count <= 0, ORDER_CLOSED), else_=table.c.status)),
+                    (table.c.open_items, table.c.open_items - count),
+                )
+            )
+
+    return {
+        row.id: (row.status, row.created_at)
+        for row in db.session.execute(
+            select(table.c.id, table.c.status, table.c.created_at).where(table.c.id.in_(order_ids))
+        )
+    }
+
+
+def transition_item(item_id: int, target: str) -> ItemChange:
+    """
+    Ubah status satu item secara atomik: UPDATE ... WHERE id = :id AND status IN (:asal).
+    Dua request bersamaan untuk item yang sama → hanya satu yang berhasil, yang lain InvalidTransition
+    (ItemNotFound kalau id item memang tidak ada).
+    Waktu transisi disimpan di kolom <status>_at dan dicatat ke histogram waktu tiket.
+    Tidak commit; pemanggil commit bersama event.
+    """
+    sources = ITEM_TRANSITIONS[target]
+    table = OrderItem.__table__
+    now = datetime.now()
+    updated = db.session.execute(
+        table.update()
+        .where(table.c.id == item_id, table.c.status.in_(sources))
+        .values({"status": target, TICKET_STAGES[target]: now})
+    ).rowcount
+    if not updated:
+        # jalur gagal saja: bedakan item yang tidak ada dari status yang sudah berubah
+        exists = db.session.execute(select(table.c.id).where(table.c.id == item_id)).first()
+        raise (InvalidTransition if exists else ItemNotFound)(target, [item_id])
+
+    row = db.session.execute(
+        select(table.c.id, table.c.order_id, table.c.menu_item_id, table.c.quantity, table.c.station)
+        .where(table.c.id == item_id)
+    ).one()
+    order_status, created_at = _apply_order_effects(target, [row.order_id], {row.order_id: 1})[row.order_id]
+    record_ticket_times(target, now, [(row.menu_item_id, row.station, created_at)])
+    return ItemChange(row.id, row.order_id, row.menu_item_id, row.quantity, row.station, target, order_status)
+
+
+def transition_items(target: str, item_ids=None, order_id=None, station=None) -> list:
+    """
+    Versi batch transition_item: semua item (berdasarkan id atau order) yang statusnya sah
+    diubah dengan satu UPDATE ... WHERE id IN (...). Item yang statusnya tidak sah dilewati,
+    begitu juga item station lain kalau `station` diisi (layar per station).
+    Return list ItemChange (kosong kalau tidak ada yang berubah).
+    """
+    sources = ITEM_TRANSITIONS[target]
+    table = OrderItem.__table__
+    query = select(table.c.id, table.c.order_id, table.c.menu_item_id, table.c.quantity, table.c.station)
+    if order_id is not None:
+        query = query.where(table.c.order_id == order_id)
+    else:
+        query = query.where(table.c.id.in_(item_ids or []))
+    if station is not None:
+        query = query.where(table.c.station == station)
+    rows = db.session.execute(
+        query.where(table.c.status.in_(sources)).order_by(table.c.id).with_for_update()
+    ).all()
+    if not rows:
+        return []
+
+    now = datetime.now()
+    updated = db.session.execute(
+        table.update()
+        .where(table.c.id.in_([row.id for row in rows]), table.c.status.in_(sources))
+        .values({"status": target, TICKET_STAGES[target]: now})
+    ).rowcount
+    if updated != len(rows):
+        # baris berubah di antara SELECT dan UPDATE (database tanpa FOR UPDATE, mis. SQLite)
+        raise InvalidTransition(target, [row.id for row in rows])
+
+    per_order = {}
+    for row in rows:
+        per_order[row.order_id] = per_order.get(row.order_id, 0) + 1
+    orders = _apply_order_effects(target, list(per_order), per_order)
+    record_ticket_times(target, now, [(row.menu_item_id, row.station, orders[row.order_id][1]) for row in rows])
+    return [
+        ItemChange(row.id, row.order_id, row.menu_item_id, row.quantity, row.station, target,
+                   orders[row.order_id][0])
+        for row in rows
+    ]
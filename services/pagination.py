@@ -0,0 +1,85 @@
+import base64
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import selectinload
+from models import Order, OrderItem
+from services.periods import in_range, day_range
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+ORDER_STATUSES = ("open", "pending", "close")
+
+
+class OrderPage(NamedTuple):
+    orders: list
+    next_cursor: Optional[str]
+    filters: dict   # filter aktif, dipakai template untuk membuat link halaman berikutnya
+
+
+def encode_cursor(created_at: datetime, order_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) atau None kalau cursor tidak valid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, order_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _parse_limit(value):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def order_history_page(args) -> OrderPage:
+    """
+    Satu halaman riwayat order dengan keyset pagination di (created_at, id), terbaru dulu.
+    args: request.args → cursor, limit, start & end (YYYY-MM-DD, inklusif), status.
+    Item & nama menu hanya di-load untuk order di halaman ini (2 query, berapa pun jumlah order).
+    """
+    limit = _parse_limit(args.get("limit"))
+    start, end = day_range(args.get("start"), args.get("end"))
+    status = args.get("status") if args.get("status") in ORDER_STATUSES else None
+
+    query = Order.query.options(
+        selectinload(Order.items).joinedload(OrderItem.menu_item)
+    )
+    query = query.filter(*in_range(Order.created_at, start, end))
+    if status:
+        query = query.filter(Order.status == status)
+
+    cursor = decode_cursor(args.get("cursor", ""))
+    if cursor:
+        created_at, order_id = cursor
+        query = query.filter(or_(
+            Order.created_at < created_at,
+            and_(Order.created_at == created_at, Order.id < order_id),
+        ))
+
+    orders = (
+        query.order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    filters = {
+        "start": args.get("start") if start else None,
+        "end": args.get("end") if end else None,
+        "status": status,
+        "limit": limit if limit != DEFAULT_PAGE_SIZE else None,
+    }
+    return OrderPage(orders, next_cursor, {k: v for k, v in filters.items() if v})
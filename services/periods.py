@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+
+# Nama periode yang dikenal period_range(). Semua rentang setengah-terbuka [awal, akhir)
+# sehingga filter bisa memakai index kolom waktu (col >= awal AND col < akhir),
+# berbeda dengan extract("year"/"month", col) == ... yang selalu full scan.
+PERIOD_NAMES = (
+    "today", "yesterday", "last_7_days", "this_week", "last_week",
+    "this_month", "last_month", "this_year", "last_year",
+)
+
+
+def period_range(name: str, now: datetime = None) -> tuple:
+    """Ubah nama periode ("this_month", "last_month", ...) menjadi (awal, akhir)."""
+    now = now or datetime.now()
+    today = datetime(now.year, now.month, now.day)
+    week_start = today - timedelta(days=today.weekday())  # Senin
+    month_start = today.replace(day=1)
+    year_start = month_start.replace(month=1)
+
+    ranges = {
+        "today": (today, today + timedelta(days=1)),
+        "yesterday": (today - timedelta(days=1), today),
+        "last_7_days": (today - timedelta(days=6), today + timedelta(days=1)),
+        "this_week": (week_start, week_start + timedelta(days=7)),
+        "last_week": (week_start - timedelta(days=7), week_start),
+        "this_month": (month_start, month_start + relativedelta(months=1)),
+        "last_month": (month_start - relativedelta(months=1), month_start),
+        "this_year": (year_start, year_start + relativedelta(years=1)),
+        "last_year": (year_start - relativedelta(years=1), year_start),
+    }
+    if name not in ranges:
+        raise ValueError(f"Periode tidak dikenal: {name}")
+    return ranges[name]
+
+
+def parse_day(value: str):
+    """Tanggal dari form/query string (YYYY-MM-DD); None kalau kosong atau tidak valid."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+
+def day_range(start: str = None, end: str = None) -> tuple:
+    """Filter tanggal inklusif dari form (start..end) → rentang setengah-terbuka (awal, akhir)."""
+    start, end = parse_day(start), parse_day(end)
+    return start, end + timedelta(days=1) if end else None
+
+
+def in_range(column, start=None, end=None):
+    """Predikat SQL setengah-terbuka untuk kolom waktu; batas None diabaikan."""
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    return conditions
+
+
+def in_period(column, name: str, now: datetime = None):
+    """Predikat SQL untuk periode bernama, contoh: query.filter(*in_period(Order.created_at, "this_month"))."""
+    return in_range(column, *period_range(name, now))
@@ -0,0 +1,296 @@
+import json
+import threading
+from flask import current_app
+from flask_login import current_user
+from flask_socketio import join_room, leave_room
+from sqlalchemy import select, func
+from extensions import db, socketio
+from models import MenuItem, OrderEvent
+from services.catalog import get_catalog
+from services.stations import KITCHEN_STATIONS, normalize_station, station_room
+
+# Room per role. Client masuk ke room sesuai role user (flask_login) saat connect,
+# jadi event hanya dikirim ke layar yang memang menampilkannya.
+KITCHEN_ROOM = "kitchen"
+WAITER_ROOM = "waiter"
+CASHIER_ROOM = "cashier"
+ROLE_ROOMS = {
+    "kitchen": KITCHEN_ROOM,
+    "waiter": WAITER_ROOM,
+    "cashier": CASHIER_ROOM,
+}
+
+# Room per station dapur ("kitchen-grill", ...) → station. Layar station masuk ke room ini
+# (bukan room "kitchen"), jadi hanya menerima item station-nya.
+STATION_ROOMS = {station_room(station): station for station in KITCHEN_STATIONS}
+
+# Role yang boleh memantau order tertentu (room order-<id>)
+ORDER_WATCH_ROLES = {"cashier", "admin"}
+
+# Pembersihan event lama dilakukan tiap N event (bukan tiap commit). Jaraknya dihitung dari id
+# pembersihan terakhir di proses ini, bukan id % N: id bisa melompat (rollback, auto_increment_increment > 1).
+PRUNE_EVERY = 100
+_next_prune_id = 0
+
+# Status item → room role yang perlu tahu:
+# - dapur menampilkan item open/cooking (badge berubah, hilang saat delivered)
+# - waiter menampilkan item ready sampai diantar
+STATUS_ROOMS = {
+    "cooking": (KITCHEN_ROOM,),
+    "ready": (KITCHEN_ROOM, WAITER_ROOM),
+    "delivered": (KITCHEN_ROOM, WAITER_ROOM),
+}
+
+
+def order_room(order_id) -> str:
+    return f"order-{order_id}"
+
+
+def _rooms_for(payload: dict) -> list:
+    rooms = list(STATUS_ROOMS.get(payload.get("status"), ()))
+    if KITCHEN_ROOM in rooms:
+        stations = {item.get("station") for item in payload.get("items", [payload])} - {None}
+        rooms += [station_room(station) for station in sorted(stations)]
+    return [*rooms, order_room(payload["order_id"])]
+
+
+def scope_event(event: dict, room: str):
+    """
+    Event untuk satu room: room station hanya menerima item station-nya, jadi event batch
+    (banyak item satu order) dipangkas. None kalau tidak ada item untuk room tersebut.
+    """
+    station = STATION_ROOMS.get(room)
+    if station is None or "items" not in event:
+        return event
+    items = [item for item in event["items"] if item.get("station") == station]
+    return {**event, "items": items} if items else None
+
+
+def record_order_update(payload: dict) -> dict:
+    """
+    Simpan event ke tabel order_event di transaksi yang sedang berjalan (panggil sebelum commit).
+    Return payload + "seq" (id event) untuk dikirim lewat emit_order_update() setelah commit.
+    """
+    event = OrderEvent(
+        order_id=payload["order_id"],
+        rooms="," + ",".join(_rooms_for(payload)) + ",",
+        payload=json.dumps(payload),
+    )
+    db.session.add(event)
+    db.session.flush()
+
+    global _next_prune_id
+    if event.id >= _next_prune_id:
+        _next_prune_id = event.id + PRUNE_EVERY
+        retention = current_app.config["ORDER_EVENT_RETENTION"]
+        db.session.execute(OrderEvent.__table__.delete().where(OrderEvent.id <= event.id - retention))
+    return {**payload, "seq": event.id}
+
+
+class BroadcastBuffer:
+    """
+    Penampung event sebelum dikirim ke client, supaya lonjakan perubahan status saat ramai
+    tidak menjadi puluhan emit per detik.
+    - event dikumpulkan per room selama `window` detik lalu dikirim sebagai satu "order_update_batch"
+    - beberapa perubahan untuk item yang sama di room yang sama digabung (hanya yang terbaru dikirim)
+    - room yang sudah berisi `max_batch` event langsung dikirim tanpa menunggu window
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}       # room -> {kunci: event}, urut sesuai waktu masuk
+        self._scheduled = False  # flush berjangka sudah dijadwalkan
+
+    def add(self, event: dict, rooms, window: float, max_batch: int) -> None:
+        # event batch (banyak item) tidak digabung; event satu item digabung per item
+        key = ("item", event["id"]) if "id" in event else ("seq", event["seq"])
+        full = []
+        with self._lock:
+            for room in rooms:
+                scoped = scope_event(event, room)
+                if scoped is None:
+                    continue
+                pending = self._pending.setdefault(room, {})
+                existing = pending.get(key)
+                if existing is not None and existing["seq"] > event["seq"]:
+                    continue  # event lama yang datang terlambat (request paralel)
+                pending.pop(key, None)
+                pending[key] = scoped
+                if len(pending) >= max_batch:
+                    full.append((room, self._pending.pop(room)))
+            schedule = bool(self._pending) and not self._scheduled
+            if schedule:
+                self._scheduled = True
+
+        for room, pending in full:
+            self._emit(room, pending)
+        if schedule:
+            socketio.start_background_task(self._flush_later, window)
+
+    def _flush_later(self, window: float) -> None:
+        socketio.sleep(window)
+        self.flush()
+
+    def flush(self) -> None:
+        """Kirim semua event yang masih ditampung."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        for room, events in pending.items():
+            self._emit(room, events)
+
+    @staticmethod
+    def _emit(room: str, pending: dict) -> None:
+        events = sorted(pending.values(), key=lambda event: event["seq"])
+        socketio.emit("order_update_batch", {"events": events}, to=room)
+
+
+broadcast_buffer = BroadcastBuffer()
+
+
+def _broadcast(events: list, direct) -> None:
+    """Lewat broadcast_buffer kalau ORDER_EVENT_COALESCE_WINDOW > 0, selain itu langsung direct()."""
+    window = current_app.config.get("ORDER_EVENT_COALESCE_WINDOW", 0)
+    if window <= 0:
+        direct()
+        return
+    max_batch = current_app.config.get("ORDER_EVENT_COALESCE_MAX", 100)
+    for event in events:
+        broadcast_buffer.add(event, _rooms_for(event), window, max_batch)
+
+
+def emit_order_update(payload: dict) -> None:
+    """
+    Kirim "order_update" hanya ke room yang membutuhkan status tersebut + room order-nya.
+    Client yang ada di beberapa room sekaligus tetap menerima satu kali.
+    """
+    _broadcast([payload], lambda: socketio.emit("order_update", payload, to=_rooms_for(payload)))
+
+
+def emit_order_update_batch(events: list) -> None:
+    """
+    Kirim banyak event sebagai satu "order_update_batch": satu pesan ke room role (dapur/waiter)
+    berisi semua event, ke tiap room station hanya item station tersebut,
+    dan ke tiap room order hanya event order tersebut.
+    """
+    def direct():
+        role_rooms = sorted({room for event in events for room in STATUS_ROOMS.get(event.get("status"), ())})
+        if role_rooms:
+            socketio.emit("order_update_batch", {"events": events}, to=role_rooms)
+        station_rooms = sorted({room for event in events for room in _rooms_for(event) if room in STATION_ROOMS})
+        for room in station_rooms:
+            scoped = [event for event in (scope_event(e, room) for e in events if room in _rooms_for(e)) if event]
+            if scoped:
+                socketio.emit("order_update_batch", {"events": scoped}, to=room)
+        for event in events:
+            socketio.emit("order_update_batch", {"events": [event]}, to=order_room(event["order_id"]))
+
+    _broadcast(events, direct)
+
+
+def latest_seq() -> int:
+    return db.session.execute(select(func.max(OrderEvent.id))).scalar() or 0
+
+
+def order_changes(room: str, since, snapshot) -> dict:
+    """
+    Event untuk satu room setelah seq `since` (dipanggil client saat reconnect).
+    - delta    → {"mode": "delta", "seq": ..., "events": [...]}
+    - snapshot → {"mode": "snapshot", "seq": ..., "items": snapshot()} kalau since tidak valid,
+      event yang dibutuhkan sudah terhapus (lewat retensi), atau selisihnya terlalu banyak
+    """
+    oldest, latest = db.session.execute(select(func.min(OrderEvent.id), func.max(OrderEvent.id))).one()
+    latest = latest or 0
+    max_delta = current_app.config["ORDER_EVENT_MAX_DELTA"]
+
+    gap_too_old = since is None or since < 0 or since > latest or (oldest is not None and since < oldest - 1)
+    if not gap_too_old:
+        rows = db.session.execute(
+            select(OrderEvent.id, OrderEvent.payload)
+            .where(OrderEvent.id > since, OrderEvent.rooms.like(f"%,{room},%"))
+            .order_by(OrderEvent.id)
+            .limit(max_delta + 1)
+        ).all()
+        if len(rows) <= max_delta:
+            events = [scope_event({**json.loads(payload), "seq": seq}, room) for seq, payload in rows]
+            events = [event for event in events if event is not None]
+            return {"mode": "delta", "seq": max([latest] + [e["seq"] for e in events]), "events": events}
+
+    # seq dibaca sebelum snapshot: event yang masuk selama snapshot dibuat akan dikirim ulang, bukan hilang
+    return {"mode": "snapshot", "seq": latest, "items": snapshot()}
+
+
+def menu_name(menu_item_id) -> str:
+    # dari katalog (tanpa query); fallback ke database kalau katalog proses ini belum ter-refresh
+    entry = get_catalog().get(menu_item_id)
+    return entry.name if entry else db.session.get(MenuItem, menu_item_id).name
+
+
+def change_payload(change) -> dict:
+    """Payload event untuk satu ItemChange (services/order_state.py)."""
+    return {
+        "id": change.id,
+        "order_id": change.order_id,
+        "status": change.status,
+        "order_status": change.order_status,   # "close" kalau item terakhir sudah diantar
+        "menu_name": menu_name(change.menu_item_id),  # dipakai waiter untuk render row baru
+        "quantity": change.quantity,
+        "station": change.station,
+    }
+
+
+def item_payload(item) -> dict:
+    """Data satu OrderItem untuk me-render baris di layar dapur/waiter."""
+    return {
+        "id": item.id,
+        "order_id": item.order_id,
+        "status": item.status,
+        "menu_name": item.menu_item.name,
+        "quantity": item.quantity,
+        "notes": item.notes,
+        "station": item.station,
+    }
+
+
+# ========================
+# HANDLER SOCKET.IO
+# ========================
+@socketio.on("connect")
+def on_connect(auth=None):
+    if not current_user.is_authenticated:
+        return False  # tolak koneksi anonim
+    room = ROLE_ROOMS.get(current_user.role)
+    # layar dapur per station: io({auth: {station: "grill"}}) → hanya room station tersebut
+    station = normalize_station(auth.get("station")) if isinstance(auth, dict) else None
+    if room == KITCHEN_ROOM and station:
+        room = station_room(station)
+    if room:
+        join_room(room)
+
+
+@socketio.on("join_order")
+def on_join_order(data):
+    """Kasir membuka daftar/detail order → ikut menerima update item order tersebut."""
+    if not current_user.is_authenticated or current_user.role not in ORDER_WATCH_ROLES:
+        return
+    for order_id in _order_ids(data):
+        join_room(order_room(order_id))
+
+
+@socketio.on("leave_order")
+def on_leave_order(data):
+    for order_id in _order_ids(data):
+        leave_room(order_room(order_id))
+
+
+def _order_ids(data):
+    """Terima {"order_id": 1} atau {"order_ids": [1, 2]}; abaikan nilai yang bukan angka."""
+    data = data if isinstance(data, dict) else {}
+    raw = data.get("order_ids") or [data.get("order_id")]
+    ids = []
+    for value in raw if isinstance(raw, list) else []:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
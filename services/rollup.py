@@ -0,0 +1,246 @@
+import click
+from flask.cli import AppGroup
+from extensions import db
+from models import Order, OrderItem, SalesByHour, MenuQtyByHour, TicketTimeByHour
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, extract, insert, select, bindparam
+from sqlalchemy.exc import IntegrityError
+from services.periods import in_range
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """Bulatkan waktu ke awal jam, dipakai sebagai kunci tabel rollup."""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _bump(model, keys: dict, increments: dict) -> None:
+    """
+    Tambahkan nilai ke satu baris rollup (UPDATE col = col + n).
+    Jika baris belum ada → INSERT; kalau kalah balapan dengan transaksi lain → ulangi UPDATE.
+    """
+    table = model.__table__
+    stmt = (
+        table.update()
+        .where(*(table.c[k] == v for k, v in keys.items()))
+        .values({k: table.c[k] + v for k, v in increments.items()})
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(**keys, **increments))
+    except IntegrityError:
+        db.session.execute(stmt)
+
+
+def record_order(created_at: datetime, total, lines) -> None:
+    """
+    Catat satu order ke tabel rollup, di transaksi yang sama dengan INSERT order.
+    lines: iterable (menu_item_id, quantity, price).
+    """
+    bucket = hour_bucket(created_at)
+    _bump(SalesByHour, {"bucket": bucket}, {"total_sales": int(total or 0), "order_count": 1})
+
+    per_menu = {}
+    for menu_item_id, qty, price in lines:
+        q, r = per_menu.get(menu_item_id, (0, 0))
+        per_menu[menu_item_id] = (q + qty, r + qty * price)
+    if per_menu:
+        _bump_menu_bucket(bucket, per_menu)
+
+
+def _bump_menu_bucket(bucket: datetime, per_menu: dict) -> None:
+    """
+    Versi batch _bump untuk banyak menu di satu jam: 1 SELECT baris yang sudah ada,
+    1 UPDATE executemany, 1 INSERT executemany — berapa pun jumlah menu di order.
+    """
+    table = MenuQtyByHour.__table__
+    existing = set(db.session.execute(
+        select(table.c.menu_item_id)
+        .where(table.c.bucket == bucket, table.c.menu_item_id.in_(per_menu))
+    ).scalars())
+
+    updates = [
+        {"b_bucket": bucket, "b_menu_item_id": menu_item_id, "b_quantity": qty, "b_revenue": revenue}
+        for menu_item_id, (qty, revenue) in per_menu.items() if menu_item_id in existing
+    ]
+    if updates:
+        db.session.execute(
+            table.update()
+            .where(table.c.bucket == bindparam("b_bucket"),
+                   table.c.menu_item_id == bindparam("b_menu_item_id"))
+            .values(quantity=table.c.quantity + bindparam("b_quantity"),
+                    revenue=table.c.revenue + bindparam("b_revenue")),
+            updates,
+        )
+
+    missing = {k: v for k, v in per_menu.items() if k not in existing}
+    if not missing:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert(), [
+                {"bucket": bucket, "menu_item_id": menu_item_id, "quantity": qty, "revenue": revenue}
+                for menu_item_id, (qty, revenue) in missing.items()
+            ])
+    except IntegrityError:
+        # transaksi lain baru saja membuat sebagian baris → jatuh ke jalur per baris
+        for menu_item_id, (qty, revenue) in missing.items():
+            _bump(
+                MenuQtyByHour,
+                {"bucket": bucket, "menu_item_id": menu_item_id},
+                {"quantity": qty, "revenue": revenue},
+            )
+
+
+# ========================
+# HISTOGRAM WAKTU TIKET
+# ========================
+# Batas atas tiap bin (detik sejak checkout); bin terakhir = di atas batas terakhir.
+TICKET_TIME_BINS = (30, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200)
+# Status item yang dicatat waktunya → kolom timestamp di order_item
+TICKET_STAGES = {
+    "cooking": "cooking_at",      # lama antre sebelum mulai dimasak
+    "ready": "ready_at",          # waktu tiket dapur
+    "delivered": "delivered_at",  # total sampai diantar ke meja
+}
+
+
+def ticket_bin(seconds: float) -> int:
+    """Index bin histogram untuk durasi tertentu."""
+    for index, upper in enumerate(TICKET_TIME_BINS):
+        if seconds <= upper:
+            return index
+    return len(TICKET_TIME_BINS)
+
+
+def record_ticket_times(stage: str, at: datetime, samples) -> None:
+    """
+    Catat durasi item yang baru mencapai `stage` ke histogram, di transaksi yang sama dengan transisinya.
+    samples: iterable (menu_item_id, station item, waktu checkout).
+    """
+    per_bin = {}
+    for menu_item_id, station, started_at in samples:
+        if started_at is None:
+            continue
+        key = (menu_item_id, station or "", ticket_bin(max((at - started_at).total_seconds(), 0)))
+        per_bin[key] = per_bin.get(key, 0) + 1
+
+    bucket = hour_bucket(at)
+    for (menu_item_id, station, bin_index), count in sorted(per_bin.items()):
+        _bump(
+            TicketTimeByHour,
+            {"bucket": bucket, "menu_item_id": menu_item_id, "station": station, "stage": stage,
+             "bin": bin_index},
+            {"count": count},
+        )
+
+
+def backfill_ticket_times(since: datetime = None) -> int:
+    """Bangun ulang ticket_time_by_hour dari timestamp di order_item. Return jumlah baris histogram."""
+    counts = {}
+    for stage, column_name in TICKET_STAGES.items():
+        column = OrderItem.__table__.c[column_name]
+        query = (
+            select(column, OrderItem.menu_item_id, OrderItem.station, Order.created_at)
+            .join(Order, OrderItem.order_id == Order.id)
+            .where(column.isnot(None), Order.created_at.isnot(None))
+        )
+        if since is not None:
+            query = query.where(*in_range(column, hour_bucket(since)))
+        rows = db.session.execute(query.execution_options(yield_per=1000))
+        for at, menu_item_id, station, created_at in rows:
+            key = (hour_bucket(at), menu_item_id, station or "", stage,
+                   ticket_bin(max((at - created_at).total_seconds(), 0)))
+            counts[key] = counts.get(key, 0) + 1
+
+    delete = TicketTimeByHour.__table__.delete()
+    if since is not None:
+        delete = delete.where(*in_range(TicketTimeByHour.bucket, hour_bucket(since)))
+    db.session.execute(delete)
+    if counts:
+        db.session.execute(insert(TicketTimeByHour), [
+            {"bucket": bucket, "menu_item_id": menu_item_id, "station": station, "stage": stage,
+             "bin": bin_index, "count": count}
+            for (bucket, menu_item_id, station, stage, bin_index), count in counts.items()
+        ])
+    db.session.commit()
+    return len(counts)
+
+
+def _bucket_from(day, hour) -> datetime:
+    """Gabungkan hasil func.date() (string di SQLite, date di MySQL) dengan jam."""
+    if not isinstance(day, date):
+        day = date.fromisoformat(str(day))
+    return datetime(day.year, day.month, day.day) + timedelta(hours=int(hour))
+
+
+def backfill(since: datetime = None) -> tuple:
+    """Bangun ulang tabel rollup dari histori Order/OrderItem. Return (jumlah baris sales, jumlah baris menu)."""
+    order_day = func.date(Order.created_at).label("day")
+    order_hour = extract("hour", Order.created_at).label("hour")
+
+    sales_query = (
+        db.session.query(order_day, order_hour, func.sum(Order.total), func.count(Order.id))
+        .filter(Order.created_at.isnot(None))
+    )
+    menu_query = (
+        db.session.query(
+            order_day, order_hour, OrderItem.menu_item_id,
+            func.sum(OrderItem.quantity), func.sum(OrderItem.quantity * OrderItem.price)
+        )
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(Order.created_at.isnot(None))
+    )
+
+    sales_delete = SalesByHour.__table__.delete()
+    menu_delete = MenuQtyByHour.__table__.delete()
+    if since is not None:
+        since = hour_bucket(since)
+        sales_query = sales_query.filter(*in_range(Order.created_at, since))
+        menu_query = menu_query.filter(*in_range(Order.created_at, since))
+        sales_delete = sales_delete.where(*in_range(SalesByHour.bucket, since))
+        menu_delete = menu_delete.where(*in_range(MenuQtyByHour.bucket, since))
+
+    sales_rows = [
+        {"bucket": _bucket_from(d, h), "total_sales": int(total or 0), "order_count": int(count)}
+        for d, h, total, count in sales_query.group_by("day", "hour")
+    ]
+    menu_rows = [
+        {"bucket": _bucket_from(d, h), "menu_item_id": menu_item_id,
+         "quantity": int(qty or 0), "revenue": float(revenue or 0)}
+        for d, h, menu_item_id, qty, revenue in menu_query.group_by("day", "hour", OrderItem.menu_item_id)
+    ]
+
+    db.session.execute(sales_delete)
+    db.session.execute(menu_delete)
+    if sales_rows:
+        db.session.execute(insert(SalesByHour), sales_rows)
+    if menu_rows:
+        db.session.execute(insert(MenuQtyByHour), menu_rows)
+    db.session.commit()
+    return len(sales_rows), len(menu_rows)
+
+
+# ========================
+# CLI: flask rollup backfill
+# ========================
+rollup_cli = AppGroup("rollup", help="Kelola tabel rollup penjualan & waktu tiket per jam.")
+
+
+@rollup_cli.command("backfill")
+@click.option("--since", type=click.DateTime(), default=None,
+              help="Hanya bangun ulang mulai tanggal ini (default: seluruh histori).")
+def backfill_command(since):
+    """Isi tabel rollup dari histori pesanan."""
+    sales, menu = backfill(since)
+    click.echo(f"✅ Rollup selesai: {sales} baris sales_by_hour, {menu} baris menu_qty_by_hour.")
+
+
+@rollup_cli.command("ticket-times")
+@click.option("--since", type=click.DateTime(), default=None,
+              help="Hanya bangun ulang mulai tanggal ini (default: seluruh histori).")
+def ticket_times_command(since):
+    """Isi histogram waktu tiket dari timestamp status item."""
+    rows = backfill_ticket_times(since)
+    click.echo(f"✅ Rollup selesai: {rows} baris ticket_time_by_hour.")
@@ -0,0 +1,165 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from services.catalog import get_catalog
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+# Skor minimum (0..1) supaya hasil fuzzy yang terlalu jauh tidak ikut tampil
+MIN_SCORE = 0.3
+# Bobot kecocokan di nama vs deskripsi
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Huruf kecil tanpa aksen: "Ayam Bakar Spésial" → "ayam bakar spesial"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def words(text: str) -> list:
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(word: str) -> set:
+    """Trigram kata dengan padding ("  ay", " aya", ...) sehingga awal kata lebih berbobot."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(query_grams: set, grams: set) -> float:
+    """Jaccard antara trigram query dan trigram satu kata."""
+    shared = len(query_grams & grams)
+    return shared / (len(query_grams) + len(grams) - shared) if shared else 0.0
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein (sisip/hapus/ganti satu huruf = 1)."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _typo_similarity(query_word: str, word: str) -> float:
+    """Salah ketik 1 huruf (kata pendek) atau 2 huruf (kata ≥ 5 huruf) tetap dianggap mirip."""
+    max_typos = 1 if len(query_word) <= 4 else 2
+    if abs(len(query_word) - len(word)) > max_typos:
+        return 0.0
+    distance = edit_distance(query_word, word)
+    return 1 - distance / max(len(query_word), len(word)) if distance <= max_typos else 0.0
+
+
+class MenuSearchIndex:
+    """
+    Index pencarian menu di memori, dibangun dari menu aktif satu snapshot katalog.
+    - inverted index trigram → kata, kata → menu (nama & deskripsi terpisah)
+    - setiap kata query dicocokkan ke kata di menu yang berbagi trigram, dengan skor
+      kemiripan trigram atau jarak edit (toleran salah ketik),
+      lalu skor per menu = rata-rata kemiripan kata query, nama lebih berbobot dari deskripsi
+    - nama yang diawali / mengandung frasa query mendapat bonus skor
+    """
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.snapshot = snapshot
+        self._grams = defaultdict(set)      # trigram → {kata}
+        self._word_grams = {}               # kata → trigram
+        self._postings = defaultdict(set)   # kata → {(menu_id, bobot)}
+        self._names = {}                    # menu_id → nama ternormalisasi
+
+        for entry in snapshot.active:
+            self._names[entry.id] = normalize(entry.name)
+            for field, weight in ((entry.name, NAME_WEIGHT), (entry.description, DESCRIPTION_WEIGHT)):
+                for word in words(field):
+                    self._postings[word].add((entry.id, weight))
+                    if word not in self._word_grams:
+                        grams = trigrams(word)
+                        self._word_grams[word] = grams
+                        for gram in grams:
+                            self._grams[gram].add(word)
+
+    def _matches(self, query_word: str) -> dict:
+        """Kata di index yang mirip dengan satu kata query → kemiripan (0..1)."""
+        query_grams = trigrams(query_word)
+        candidates = set()
+        for gram in query_grams:
+            candidates |= self._grams.get(gram, set())
+
+        matches = {}
+        for word in candidates:
+            if word.startswith(query_word):
+                matches[word] = 1.0   # awalan: hasil saat user masih mengetik
+            else:
+                score = max(_similarity(query_grams, self._word_grams[word]),
+                            _typo_similarity(query_word, word))
+                if score >= MIN_SCORE:
+                    matches[word] = score
+        return matches
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list:
+        """Return daftar MenuEntry terurut dari yang paling relevan."""
+        query_words = words(query)
+        if not query_words:
+            return []
+
+        scores = defaultdict(float)
+        for query_word in query_words:
+            best = {}
+            for word, similarity in self._matches(query_word).items():
+                for menu_id, weight in self._postings[word]:
+                    best[menu_id] = max(best.get(menu_id, 0.0), similarity * weight)
+            for menu_id, score in best.items():
+                scores[menu_id] += score / len(query_words)
+
+        phrase = normalize(query).strip()
+        ranked = []
+        for menu_id, score in scores.items():
+            name = self._names[menu_id]
+            if name.startswith(phrase):
+                score += 1.0
+            elif phrase in name:
+                score += 0.5
+            if score >= MIN_SCORE:
+                ranked.append((-score, name, menu_id))
+        ranked.sort()
+        return [self.snapshot.get(menu_id) for _, _, menu_id in ranked[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> MenuSearchIndex:
+    """Index untuk versi katalog saat ini; dibangun ulang hanya kalau menu berubah."""
+    global _index
+    snapshot = get_catalog()
+    index = _index
+    if index is not None and index.snapshot is snapshot:
+        return index
+    with _index_lock:
+        if _index is None or _index.snapshot is not snapshot:
+            _index = MenuSearchIndex(snapshot)
+        return _index
+
+
+def parse_limit(value) -> int:
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_SEARCH_LIMIT
+    return max(1, min(limit, MAX_SEARCH_LIMIT))
+
+
+def search_etag(version: int, query: str, limit: int) -> str:
+    """ETag hasil pencarian: cukup dari versi katalog + query, jadi 304 tanpa perlu mencari ulang."""
+    key = f"{version}|{normalize(query).strip()}|{limit}"
+    return hashlib.sha1(key.encode()).hexdigest()
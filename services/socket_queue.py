@@ -0,0 +1,54 @@
+import json
+import threading
+import weakref
+from collections import defaultdict
+
+import socketio as socketio_lib
+
+LOCAL_QUEUE_SCHEME = "local://"
+
+
+class LocalQueueManager(socketio_lib.Manager):
+    """
+    Pengganti message queue (Redis/RabbitMQ) yang berjalan di dalam satu proses, untuk test/dev.
+    Setiap emit diteruskan ke semua server Socket.IO lain di proses yang sama dengan channel
+    yang sama, sehingga client yang terhubung ke "worker" mana pun ikut menerima.
+    Bukan turunan PubSubManager supaya tetap bisa dipakai test client Flask-SocketIO
+    (yang menolak manager berbasis message queue). Untuk produksi multi-proses pakai redis://... .
+    """
+
+    _peers = defaultdict(weakref.WeakSet)   # channel -> manager yang aktif
+    _lock = threading.Lock()
+
+    def __init__(self, channel: str = "flask-socketio"):
+        super().__init__()
+        self.channel = channel
+        with self._lock:
+            self._peers[channel].add(self)
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        namespace = namespace or "/"
+        result = super().emit(event, data, namespace, room=to or room, skip_sid=skip_sid,
+                              callback=callback, **kwargs)
+        if callback is None and not kwargs.get("ignore_queue"):
+            # diserialisasi seperti message queue sungguhan, supaya payload yang tidak bisa di-JSON-kan ketahuan
+            data = json.loads(json.dumps(data))
+            with self._lock:
+                peers = [peer for peer in self._peers[self.channel] if peer is not self and peer.server]
+            for peer in peers:
+                socketio_lib.Manager.emit(peer, event, data, namespace, room=to or room)
+        return result
+
+
+def socketio_queue_options(url: str = None, channel: str = "flask-socketio") -> dict:
+    """
+    Argumen socketio.init_app() untuk config SOCKETIO_MESSAGE_QUEUE:
+    - kosong      → tanpa message queue (satu proses saja)
+    - local://    → LocalQueueManager (test/dev, satu proses)
+    - redis://, amqp://, kafka://, zmq+... → backend bawaan Flask-SocketIO
+    """
+    if not url:
+        return {}
+    if url.startswith(LOCAL_QUEUE_SCHEME):
+        return {"client_manager": LocalQueueManager(channel=channel)}
+    return {"message_queue": url, "channel": channel}
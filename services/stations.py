@@ -0,0 +1,18 @@
+from typing import Optional
+
+# Station dapur → label di layar. Menu tanpa station (None) hanya tampil di layar dapur "Semua".
+KITCHEN_STATIONS = {
+    "grill": "Grill",
+    "fryer": "Gorengan",
+    "drinks": "Minuman",
+}
+
+
+def normalize_station(value) -> Optional[str]:
+    """Nilai station dari form/query string; None kalau kosong atau tidak dikenal."""
+    value = (value or "").strip().lower()
+    return value if value in KITCHEN_STATIONS else None
+
+
+def station_room(station: str) -> str:
+    return f"kitchen-{station}"
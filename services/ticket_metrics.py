@@ -0,0 +1,95 @@
+from extensions import db
+from models import MenuItem, TicketTimeByHour
+from sqlalchemy import func, extract
+from services.periods import period_range, in_range
+from services.rollup import TICKET_TIME_BINS, TICKET_STAGES
+
+PERCENTILES = (50, 95, 99)
+# Pilihan periode di halaman metrik dapur → nama periode di services/periods.py
+METRIC_PERIODS = {
+    "today": "Hari Ini",
+    "last_7_days": "7 Hari Terakhir",
+    "this_month": "Bulan Ini",
+}
+DEFAULT_METRIC_PERIOD = "today"
+
+
+def percentile(counts: dict, p: float):
+    """
+    Perkiraan persentil (detik) dari histogram {bin: jumlah}, interpolasi linear di dalam bin.
+    Bin terakhir tidak punya batas atas → dilaporkan batas bawahnya. None kalau histogram kosong.
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    target = total * p / 100
+    seen = 0
+    for index in range(len(TICKET_TIME_BINS) + 1):
+        count = counts.get(index, 0)
+        if count and seen + count >= target:
+            lower = TICKET_TIME_BINS[index - 1] if index else 0
+            if index == len(TICKET_TIME_BINS):
+                return lower
+            return lower + (TICKET_TIME_BINS[index] - lower) * (target - seen) / count
+        seen += count
+    return TICKET_TIME_BINS[-1]
+
+
+def _summaries(rows) -> dict:
+    """rows: (kunci, stage, bin, jumlah) → {kunci: {stage: {"count": n, "p50": detik, ...}}}"""
+    histograms = {}
+    for key, stage, bin_index, count in rows:
+        histogram = histograms.setdefault(key, {}).setdefault(stage, {})
+        histogram[int(bin_index)] = histogram.get(int(bin_index), 0) + int(count or 0)
+
+    return {
+        key: {
+            stage: {"count": sum(counts.values()), **{f"p{p}": percentile(counts, p) for p in PERCENTILES}}
+            for stage, counts in stages.items()
+        }
+        for key, stages in histograms.items()
+    }
+
+
+def ticket_time_report(period: str = DEFAULT_METRIC_PERIOD, now=None) -> dict:
+    """
+    Persentil waktu tiket per menu, per jam, dan per station dapur untuk satu periode.
+    Dibaca dari ticket_time_by_hour (range di primary key bucket), 3 query.
+    Station = station item saat checkout (kolom station di histogram), jadi memindah menu ke
+    station lain tidak mengubah angka lama.
+    """
+    period = period if period in METRIC_PERIODS else DEFAULT_METRIC_PERIOD
+    window = in_range(TicketTimeByHour.bucket, *period_range(period, now))
+    total = func.sum(TicketTimeByHour.count)
+
+    per_menu = _summaries(
+        db.session.query(MenuItem.name, TicketTimeByHour.stage, TicketTimeByHour.bin, total)
+        .join(MenuItem, TicketTimeByHour.menu_item_id == MenuItem.id)
+        .filter(*window)
+        .group_by(MenuItem.name, TicketTimeByHour.stage, TicketTimeByHour.bin)
+    )
+    hour = extract("hour", TicketTimeByHour.bucket).label("hour")
+    per_hour = _summaries(
+        (int(h), stage, bin_index, count)
+        for h, stage, bin_index, count in (
+            db.session.query(hour, TicketTimeByHour.stage, TicketTimeByHour.bin, total)
+            .filter(*window)
+            .group_by(hour, TicketTimeByHour.stage, TicketTimeByHour.bin)
+        )
+    )
+    per_station = _summaries(
+        (station or None, stage, bin_index, count)   # "" = umum
+        for station, stage, bin_index, count in (
+            db.session.query(TicketTimeByHour.station, TicketTimeByHour.stage, TicketTimeByHour.bin, total)
+            .filter(*window)
+            .group_by(TicketTimeByHour.station, TicketTimeByHour.stage, TicketTimeByHour.bin)
+        )
+    )
+    return {
+        "period": period,
+        "stages": tuple(TICKET_STAGES),
+        "percentiles": PERCENTILES,
+        "per_menu": sorted(per_menu.items()),
+        "per_hour": sorted(per_hour.items()),
+        "per_station": sorted(per_station.items(), key=lambda row: row[0] or ""),
+    }
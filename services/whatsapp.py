@@ -0,0 +1,226 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import click
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from flask.cli import AppGroup
+from extensions import db
+from models import WhatsAppOutbox
+
+logger = logging.getLogger(__name__)
+
+# Berapa lama pesan "sending" dianggap milik satu worker sebelum boleh diambil ulang
+# (misalnya worker mati di tengah pengiriman).
+CLAIM_LEASE = timedelta(minutes=2)
+BATCH_SIZE = 20
+
+
+def normalize_phone(phone: str) -> str:
+    """08xx → 628xx (format internasional untuk Fonnte)."""
+    phone = (phone or "").strip().replace(" ", "")
+    if phone.startswith("0"):
+        phone = "62" + phone[1:]
+    return phone
+
+
+def enqueue_message(phone: str, message: str, order_id: int = None) -> WhatsAppOutbox:
+    """
+    Simpan pesan ke outbox di transaksi yang sedang berjalan (belum commit).
+    Pengiriman dilakukan worker background setelah transaksi commit.
+    """
+    outbox = WhatsAppOutbox(
+        order_id=order_id,
+        phone=normalize_phone(phone),
+        message=message,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(),
+    )
+    db.session.add(outbox)
+    return outbox
+
+
+class OutboxWorker:
+    """
+    Worker pengirim pesan dari tabel whatsapp_outbox.
+    - satu requests.Session (connection pool) dipakai ulang untuk semua pesan
+    - setiap request memakai timeout (connect, read)
+    - gagal → dicoba lagi dengan exponential backoff; setelah WHATSAPP_MAX_ATTEMPTS → "dead"
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- siklus hidup thread ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="whatsapp-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def notify(self):
+        """Bangunkan worker (dipanggil setelah checkout commit) tanpa menunggu poll berikutnya."""
+        self._wakeup.set()
+
+    def run_forever(self):
+        interval = self.app.config["WHATSAPP_POLL_INTERVAL"]
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    processed = self.run_once()
+            except Exception:
+                logger.exception("Outbox WhatsApp gagal diproses")
+                processed = 0
+            if not processed:
+                self._wakeup.wait(interval)
+                self._wakeup.clear()
+
+    # --- pemrosesan ---
+    def run_once(self) -> int:
+        """Kirim semua pesan yang jatuh tempo. Return jumlah pesan yang diproses."""
+        processed = 0
+        for outbox in self._claim_due():
+            self._deliver(outbox)
+            processed += 1
+        return processed
+
+    def _claim_due(self):
+        now = datetime.now()
+        due = (
+            WhatsAppOutbox.query
+            .filter(WhatsAppOutbox.status.in_(["pending", "sending"]))
+            .filter(WhatsAppOutbox.next_attempt_at <= now)
+            .order_by(WhatsAppOutbox.next_attempt_at)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        table = WhatsAppOutbox.__table__
+        claimed = []
+        for outbox in due:
+            # klaim secara atomik: hanya satu worker yang berhasil mengubah baris ini
+            result = db.session.execute(
+                table.update()
+                .where(table.c.id == outbox.id,
+                       table.c.status == outbox.status,
+                       table.c.next_attempt_at == outbox.next_attempt_at)
+                .values(status="sending", next_attempt_at=now + CLAIM_LEASE)
+            )
+            if result.rowcount:
+                claimed.append((outbox.id, outbox.phone, outbox.message, outbox.attempts))
+        db.session.commit()
+        return claimed
+
+    def _deliver(self, claimed):
+        outbox_id, phone, message, attempts = claimed
+        config = self.app.config
+        error = None
+        try:
+            response = self.http.post(
+                config["FONNTE_API_URL"],
+                data={"target": phone, "message": message},
+                headers={"Authorization": config["FONNTE_API_KEY"]},
+                timeout=(config["WHATSAPP_CONNECT_TIMEOUT"], config["WHATSAPP_READ_TIMEOUT"]),
+            )
+            if not response.ok:
+                error = f"HTTP {response.status_code}: {response.text[:500]}"
+            elif _json_status(response) is False:
+                error = f"Ditolak gateway: {response.text[:500]}"
+        except requests.RequestException as e:
+            error = f"{type(e).__name__}: {e}"
+
+        table = WhatsAppOutbox.__table__
+        attempts += 1
+        if error is None:
+            values = dict(status="sent", attempts=attempts, sent_at=datetime.now(), last_error=None)
+        elif attempts >= config["WHATSAPP_MAX_ATTEMPTS"]:
+            logger.warning("Pesan WhatsApp #%s gagal permanen: %s", outbox_id, error)
+            values = dict(status="dead", attempts=attempts, last_error=error)
+        else:
+            delay = min(config["WHATSAPP_BACKOFF_BASE"] * 2 ** (attempts - 1), config["WHATSAPP_BACKOFF_MAX"])
+            values = dict(status="pending", attempts=attempts, last_error=error,
+                          next_attempt_at=datetime.now() + timedelta(seconds=delay))
+        db.session.execute(table.update().where(table.c.id == outbox_id).values(**values))
+        db.session.commit()
+
+
+def _json_status(response):
+    """Fonnte membalas {"status": true/false, ...}; None kalau bukan JSON."""
+    try:
+        return response.json().get("status")
+    except (ValueError, AttributeError):
+        return None
+
+
+# Worker di proses web (WHATSAPP_WORKER = "thread"), dijalankan saat request pertama masuk
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_worker(app):
+    """
+    Jalankan worker in-process kalau WHATSAPP_WORKER = "thread" (thread-nya dijalankan ulang kalau
+    sudah mati). Return worker, atau None untuk mode lain.
+    """
+    global _worker
+    if app.config.get("WHATSAPP_WORKER") != "thread":
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = OutboxWorker(app)
+        _worker.start()
+    return _worker
+
+
+def init_worker(app):
+    """
+    Mode "thread": worker dijalankan pada request pertama, bukan saat create_app(), supaya proses yang
+    tidak melayani request (flask db upgrade, flask rollup, reloader, flask whatsapp worker) tidak ikut
+    mengirim. Pesan yang masih pending / tertinggal "sending" terkirim tanpa menunggu checkout berikutnya.
+    """
+    if app.config.get("WHATSAPP_WORKER") != "thread":
+        return
+
+    @app.before_request
+    def start_whatsapp_worker():
+        if _worker is None:
+            start_worker(app)
+
+
+def notify_worker():
+    """Bangunkan worker in-process untuk mengirim pesan baru (dijalankan ulang kalau thread-nya mati)."""
+    worker = start_worker(current_app._get_current_object())
+    if worker is not None:
+        worker.notify()
+
+
+# ========================
+# CLI: flask whatsapp worker / flask whatsapp send-pending
+# ========================
+whatsapp_cli = AppGroup("whatsapp", help="Kelola pengiriman pesan WhatsApp dari outbox.")
+
+
+@whatsapp_cli.command("worker")
+def worker_command():
+    """Jalankan worker pengirim outbox sebagai proses terpisah."""
+    click.echo("📨 Worker WhatsApp berjalan (Ctrl+C untuk berhenti)...")
+    OutboxWorker(current_app._get_current_object()).run_forever()
+
+
+@whatsapp_cli.command("send-pending")
+def send_pending_command():
+    """Kirim sekali semua pesan yang jatuh tempo lalu keluar."""
+    processed = OutboxWorker(current_app._get_current_object()).run_once()
+    click.echo(f"✅ {processed} pesan diproses.")
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+# config.py membaca environment saat di-import → set sebelum import app
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["WHATSAPP_WORKER"] = "external"
+
+from app import create_app
+from extensions import db
+from models import User, MenuItem
+from services import catalog, dashboard, idempotency
+from services.cache import ResultCache
+
+PASSWORD = "rahasia"
+PASSWORD_HASH = generate_password_hash(PASSWORD)  # sekali saja, hashing lambat
+ROLES = ("admin", "cashier", "kitchen", "waiter")
+
+
+@pytest.fixture
+def app_config():
+    """Override konfigurasi app; modul test boleh mendefinisikan ulang fixture ini."""
+    return {}
+
+
+@pytest.fixture
+def app(app_config, monkeypatch):
+    # cache per proses dibuat baru supaya tidak membawa data dari database test sebelumnya
+    monkeypatch.setattr(catalog, "catalog_cache", catalog.CatalogCache())
+    monkeypatch.setattr(dashboard, "dashboard_cache", ResultCache())
+    monkeypatch.setattr(idempotency, "checkout_cache", idempotency.ExpiringKeyCache())
+
+    app = create_app({"TESTING": True, **app_config})
+    with app.app_context():
+        db.create_all()
+        for role in ROLES:
+            db.session.add(User(name=role, email=f"{role}@lamogo.test", role=role, password_hash=PASSWORD_HASH))
+        db.session.commit()
+    # tanpa app context aktif: setiap request test client punya context & session sendiri, seperti di production
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def ctx(app):
+    """App context untuk akses database langsung dari test."""
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login():
+    def login(client, role="admin"):
+        response = client.post("/auth/login", data={"email": f"{role}@lamogo.test", "password": PASSWORD})
+        assert response.status_code == 302
+        return client
+    return login
+
+
+@pytest.fixture
+def menu_items(app):
+    """Buat n menu aktif, return list id."""
+    def create(n=5, price=1000):
+        with app.app_context():
+            items = [MenuItem(name=f"Menu {i}", description=f"Menu nomor {i}", price=price * (i + 1),
+                              is_active=True) for i in range(n)]
+            db.session.add_all(items)
+            db.session.commit()
+            return [item.id for item in items]
+    return create
+
+
+@pytest.fixture
+def queries(app):
+    """Daftar statement SQL yang dieksekusi selama test (kosongkan dengan .clear())."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Cart, CartItem, MenuItem, User
+
+
+def test_delete_menu_held_in_carts(app, client, login, menu_items):
+    menu_id, other_id = menu_items(2)
+    with app.app_context():
+        # SQLite baru memeriksa foreign key kalau diaktifkan (InnoDB selalu); sqlite:// = satu koneksi bersama
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+        cashier = User.query.filter_by(role="cashier").one()
+        now = datetime.now()
+        db.session.add_all([
+            Cart(id="a" * 32, user_id=cashier.id, expires_at=now + timedelta(hours=1)),
+            Cart(id="b" * 32, user_id=cashier.id, expires_at=now - timedelta(hours=1)),  # kadaluarsa, belum dibersihkan
+        ])
+        db.session.add_all([
+            CartItem(cart_id="a" * 32, menu_item_id=menu_id, quantity=1, note="", added_at=now),
+            CartItem(cart_id="a" * 32, menu_item_id=other_id, quantity=2, note="", added_at=now),
+            CartItem(cart_id="b" * 32, menu_item_id=menu_id, quantity=3, note="", added_at=now),
+        ])
+        db.session.commit()
+
+    login(client, "admin")
+    response = client.get(f"/admin/menu/delete/{menu_id}")
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert db.session.get(MenuItem, menu_id) is None
+        assert [(line.cart_id, line.menu_item_id) for line in CartItem.query.all()] == [("a" * 32, other_id)]
@@ -0,0 +1,98 @@
+import pytest
+
+from extensions import db
+from models import MenuItem, Order, OrderItem, WhatsAppOutbox
+from services.catalog import bump_catalog_version, invalidate_catalog
+
+# Statement SQL untuk satu checkout, berapa pun jumlah baris keranjang:
+#   load user (Flask-Login), cek kunci idempotensi, cek keranjang, isi keranjang 4
+#   INSERT order, INSERT order_item (executemany)                               2
+#   rollup sales_by_hour: UPDATE, lalu SAVEPOINT + INSERT + RELEASE (jam baru)  4
+#   rollup menu_qty_by_hour: SELECT baris jam ini, SAVEPOINT + INSERT + RELEASE 4
+#   INSERT whatsapp_outbox, DELETE cart_item, DELETE cart                       3
+CHECKOUT_QUERY_COUNT = 17
+
+
+@pytest.fixture
+def app_config():
+    # katalog tidak dicek ulang di tengah test → jumlah query tidak bergantung waktu
+    return {"CATALOG_POLL_INTERVAL": 3600}
+
+
+def fill_cart(client, menu_ids, quantity=2):
+    for menu_id in menu_ids:
+        response = client.post("/cashier/api/cart/items", json={"menu_id": menu_id, "quantity": quantity})
+        assert response.status_code == 200
+
+
+def checkout(client, key="checkout-key-0001"):
+    return client.post("/cashier/checkout", data={
+        "customer_name": "Budi", "customer_phone": "0812 3456", "payment_method": "cash",
+        "idempotency_key": key,
+    })
+
+
+@pytest.mark.parametrize("lines", [1, 50])
+def test_checkout_query_count_is_fixed(client, login, menu_items, queries, lines):
+    menu_ids = menu_items(lines)
+    login(client, "cashier")
+    fill_cart(client, menu_ids)
+
+    queries.clear()
+    response = checkout(client)
+    assert response.status_code == 302
+    assert len(queries) == CHECKOUT_QUERY_COUNT, "\n".join(queries)
+
+
+def test_checkout_builds_order_from_cart(client, login, menu_items, app):
+    menu_ids = menu_items(50)
+    login(client, "cashier")
+    fill_cart(client, menu_ids)
+    checkout(client)
+
+    with app.app_context():
+        check_order()
+
+
+def check_order():
+
+    order = Order.query.one()
+    items = OrderItem.query.filter_by(order_id=order.id).all()
+    assert len(items) == 50
+    assert order.open_items == 50
+    assert order.total == sum(item.price * item.quantity for item in items) == sum(2000 * (i + 1) for i in range(50))
+
+    outbox = WhatsAppOutbox.query.one()
+    assert outbox.order_id == order.id
+    assert outbox.phone == "628123456"
+    assert "Menu 49" in outbox.message
+
+
+def test_checkout_rejects_cart_with_deactivated_menu(client, login, menu_items, app):
+    menu_ids = menu_items(3)
+    login(client, "cashier")
+    fill_cart(client, menu_ids)
+
+    # admin menonaktifkan menu setelah masuk keranjang
+    with app.app_context():
+        db.session.get(MenuItem, menu_ids[1]).is_active = False
+        bump_catalog_version()
+        db.session.commit()
+        invalidate_catalog()
+
+    assert client.get("/cashier/api/cart").get_json()["count"] == 4
+
+    response = checkout(client)
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/cashier/cart")
+    assert "Menu 1" in client.get("/cashier/cart").get_data(as_text=True)  # flash
+    with app.app_context():
+        assert Order.query.count() == 0
+
+    # setelah kasir memeriksa ulang: checkout hanya berisi menu yang masih aktif
+    checkout(client, key="checkout-key-0002")
+    with app.app_context():
+        order = Order.query.one()
+        items = OrderItem.query.filter_by(order_id=order.id).all()
+        assert sorted(item.menu_item_id for item in items) == [menu_ids[0], menu_ids[2]]
+        assert order.total == 2 * 1000 + 2 * 3000
@@ -0,0 +1,58 @@
+import json
+import queue
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import OrderEvent
+from services.event_stream import EventHub, _Subscriber
+
+GRACE = timedelta(seconds=5)
+
+
+def commit_event(event_id, created_at=None):
+    db.session.add(OrderEvent(id=event_id, order_id=1, rooms=",kitchen,", payload=json.dumps({"seq": event_id}),
+                              created_at=created_at or datetime.now()))
+    db.session.commit()
+
+
+def received(subscriber):
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait()[0])
+    return items
+
+
+def kitchen_hub():
+    hub = EventHub()
+    subscriber = _Subscriber("kitchen", queue.Queue(), 100)
+    hub._subscribers.add(subscriber)
+    return hub, subscriber
+
+
+def test_event_committed_out_of_id_order_is_not_skipped(ctx):
+    hub, subscriber = kitchen_hub()
+
+    # id 2 commit lebih dulu, transaksi id 1 masih berjalan
+    commit_event(2)
+    hub._poll_once(GRACE)
+    assert received(subscriber) == []
+    assert hub._last_seq == 0
+
+    commit_event(1)
+    hub._poll_once(GRACE)
+    assert received(subscriber) == [1, 2]  # tetap berurutan, tidak ada yang dobel
+
+    hub._poll_once(GRACE)
+    assert received(subscriber) == []
+
+
+def test_gap_older_than_grace_is_skipped(ctx):
+    hub, subscriber = kitchen_hub()
+    commit_event(1)
+    # id 2 di-rollback: event setelahnya dikirim begitu melewati grace window
+    commit_event(3, created_at=datetime.now() - GRACE - timedelta(seconds=1))
+    commit_event(4)
+
+    hub._poll_once(GRACE)
+    assert received(subscriber) == [1, 3, 4]
+    assert hub._last_seq == 4
@@ -0,0 +1,44 @@
+import csv
+import io
+from datetime import datetime
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+from services.export import iter_order_csv
+
+
+def export_rows():
+    return list(csv.DictReader(io.StringIO("".join(iter_order_csv()))))
+
+
+def test_export_keeps_orders_without_items(ctx):
+    menu = MenuItem(name="Es Teh", price=5000, is_active=True)
+    with_items = Order(customer_name="Ani", total=5000, status="close", created_at=datetime(2025, 3, 1, 10))
+    empty = Order(customer_name="Budi", total=0, status="open", created_at=datetime(2025, 3, 1, 11))
+    db.session.add_all([menu, with_items, empty])
+    db.session.flush()
+    db.session.add(OrderItem(order_id=with_items.id, menu_item_id=menu.id, quantity=1, price=5000, status="open"))
+    db.session.commit()
+
+    rows = export_rows()
+    assert [row["customer_name"] for row in rows] == ["Ani", "Budi"]
+    assert rows[0]["menu_name"] == "Es Teh"
+    assert (rows[1]["item_id"], rows[1]["menu_name"]) == ("", "")
+
+
+def test_export_escapes_formula_cells(ctx):
+    menu = MenuItem(name="=HYPERLINK(\"http://x\")", price=5000, is_active=True)
+    order = Order(customer_name="@SUM(A1)", customer_phone="+62812", total=5000, status="open",
+                  change_due=-500, created_at=datetime(2025, 3, 1, 10))
+    db.session.add_all([menu, order])
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, menu_item_id=menu.id, quantity=1, price=5000, status="open",
+                             notes="-1+1"))
+    db.session.commit()
+
+    row = export_rows()[0]
+    assert row["menu_name"] == "'=HYPERLINK(\"http://x\")"
+    assert row["customer_name"] == "'@SUM(A1)"
+    assert row["customer_phone"] == "'+62812"
+    assert row["notes"] == "'-1+1"
+    assert row["change_due"] == "-500"  # angka tidak diubah
@@ -0,0 +1,37 @@
+import pytest
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+
+
+@pytest.fixture
+def open_item(app):
+    with app.app_context():
+        menu = MenuItem(name="Mie Ayam", price=12000, is_active=True)
+        order = Order(customer_name="Meja 2", total=12000, status="open", open_items=1)
+        db.session.add_all([menu, order])
+        db.session.flush()
+        item = OrderItem(order_id=order.id, menu_item_id=menu.id, quantity=1, price=12000, status="open")
+        db.session.add(item)
+        db.session.commit()
+        return item.id
+
+
+def test_kitchen_transition_conflict_and_missing_item(client, login, open_item):
+    login(client, "kitchen")
+    assert client.post(f"/kitchen/api/items/{open_item}/cooking").status_code == 204
+
+    conflict = client.post(f"/kitchen/api/items/{open_item}/cooking")
+    assert conflict.status_code == 409
+    assert conflict.get_json()["item_ids"] == [open_item]
+
+    missing = client.post("/kitchen/api/items/999999/ready")
+    assert missing.status_code == 404
+    assert missing.get_json() == {"error": "Item tidak ditemukan", "item_ids": [999999]}
+
+
+def test_waiter_deliver_conflict_and_missing_item(client, login, open_item):
+    login(client, "waiter")
+    # item belum ready → konflik status
+    assert client.post(f"/waiter/api/items/{open_item}/deliver").status_code == 409
+    assert client.post("/waiter/api/items/999999/deliver").status_code == 404
@@ -0,0 +1,96 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+from services.order_state import ORDER_CLOSED, InvalidTransition, transition_item, transition_items
+
+ITEMS = 40
+TAPS_PER_ITEM = 3
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    # database file + busy timeout: setiap thread memakai koneksi & transaksinya sendiri
+    return {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'lamogo.db'}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 30}},
+    }
+
+
+@pytest.fixture
+def ready_order(app):
+    """Satu order dengan ITEMS item berstatus ready. Return (order_id, [item_id])."""
+    with app.app_context():
+        menu = MenuItem(name="Nasi Goreng", price=15000, is_active=True)
+        order = Order(customer_name="Meja 4", total=0, status="pending", open_items=ITEMS)
+        db.session.add_all([menu, order])
+        db.session.flush()
+        items = [OrderItem(order_id=order.id, menu_item_id=menu.id, quantity=1, price=15000, status="ready")
+                 for _ in range(ITEMS)]
+        db.session.add_all(items)
+        db.session.commit()
+        return order.id, [item.id for item in items]
+
+
+def run_concurrently(app, calls):
+    """Jalankan semua fungsi sekaligus (satu thread & app context per fungsi). Return hasil / exception."""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(index, call):
+        with app.app_context():
+            barrier.wait()
+            try:
+                results[index] = call()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                results[index] = e
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def assert_order_closed_once(app, order_id, calls):
+    """calls: list ItemChange per panggilan yang berhasil; tepat satu panggilan yang menutup order."""
+    assert sum(1 for changes in calls if any(change.order_status == ORDER_CLOSED for change in changes)) == 1
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        assert (order.status, order.open_items) == (ORDER_CLOSED, 0)
+        assert OrderItem.query.filter_by(order_id=order_id, status="delivered").count() == ITEMS
+
+
+def test_concurrent_deliveries_lose_no_update(app, ready_order):
+    order_id, item_ids = ready_order
+    # setiap item ditekan beberapa waiter sekaligus
+    calls = [lambda item_id=item_id: transition_item(item_id, "delivered")
+             for item_id in item_ids for _ in range(TAPS_PER_ITEM)]
+    results = run_concurrently(app, calls)
+
+    changes = [result for result in results if not isinstance(result, Exception)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert Counter(change.id for change in changes) == Counter(item_ids)
+    assert len(errors) == len(item_ids) * (TAPS_PER_ITEM - 1)
+    assert all(isinstance(error, InvalidTransition) for error in errors), errors
+
+    assert_order_closed_once(app, order_id, [[change] for change in changes])
+
+
+def test_concurrent_batch_delivery_of_same_order(app, ready_order):
+    order_id, item_ids = ready_order
+    calls = [lambda: transition_items("delivered", order_id=order_id) for _ in range(TAPS_PER_ITEM)]
+    results = run_concurrently(app, calls)
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert all(isinstance(error, InvalidTransition) for error in errors), errors
+    succeeded = [result for result in results if not isinstance(result, Exception)]
+    assert sorted(change.id for changes in succeeded for change in changes) == sorted(item_ids)
+
+    assert_order_closed_once(app, order_id, succeeded)
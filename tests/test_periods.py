@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+from services.export import iter_order_rows
+from services.pagination import order_history_page
+from services.periods import period_range, day_range
+from services.rollup import backfill
+
+NOW = datetime(2025, 3, 15, 13, 30)
+
+
+def query_plan(statement, parameters=()) -> str:
+    """Detail EXPLAIN QUERY PLAN SQLite untuk satu statement, digabung jadi satu string."""
+    rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    return " | ".join(row[-1] for row in rows)
+
+
+def executed_plans(app, call) -> list:
+    """Jalankan call(), lalu EXPLAIN setiap SELECT yang benar-benar dieksekusi (apa adanya, dengan parameternya)."""
+    selects = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    with app.app_context():
+        return [query_plan(statement, parameters) for statement, parameters in selects]
+
+
+@pytest.fixture
+def march_order(app):
+    """Satu order Maret 2025 dengan satu item (supaya query item ikut dieksekusi)."""
+    with app.app_context():
+        menu = MenuItem(name="Soto", price=15000, is_active=True)
+        order = Order(customer_name="Meja 1", total=15000, status="open", created_at=datetime(2025, 3, 10, 12))
+        db.session.add_all([menu, order])
+        db.session.flush()
+        db.session.add(OrderItem(order_id=order.id, menu_item_id=menu.id, quantity=1, price=15000, status="open"))
+        db.session.commit()
+
+
+def test_period_range_is_half_open():
+    assert period_range("today", NOW) == (datetime(2025, 3, 15), datetime(2025, 3, 16))
+    assert period_range("this_month", NOW) == (datetime(2025, 3, 1), datetime(2025, 4, 1))
+    assert period_range("last_month", NOW) == (datetime(2025, 2, 1), datetime(2025, 3, 1))
+    assert period_range("this_year", NOW) == (datetime(2025, 1, 1), datetime(2026, 1, 1))
+    assert period_range("last_year", NOW) == (datetime(2024, 1, 1), datetime(2025, 1, 1))
+    assert day_range("2025-03-01", "2025-03-31") == (datetime(2025, 3, 1), datetime(2025, 4, 1))
+
+
+def test_order_history_page_uses_indexes(app, march_order, ctx):
+    plans = executed_plans(app, lambda: order_history_page({"start": "2025-03-01", "end": "2025-03-31"}))
+    # halaman order, lalu item order di halaman itu (selectinload)
+    assert len(plans) == 2
+    assert "ix_order_created_at" in plans[0]
+    assert "ix_order_item_order_id" in plans[1]
+
+
+def test_order_export_uses_indexes(app, march_order, ctx):
+    plans = executed_plans(app, lambda: list(iter_order_rows(*day_range("2025-03-01", "2025-03-31"))))
+    assert len(plans) == 1
+    assert "ix_order_created_at" in plans[0]
+    assert "ix_order_item_order_id" in plans[0]
+
+
+def test_rollup_backfill_since_uses_indexes(app, march_order, ctx):
+    # query yang mengisi rollup dashboard
+    plans = executed_plans(app, lambda: backfill(since=period_range("this_month", NOW)[0]))
+    assert len(plans) == 2
+    assert all("ix_order_created_at" in plan for plan in plans)
+    assert "ix_order_item_order_id" in plans[1]
+
+
+def test_menu_delete_uses_menu_item_id_index(app, client, login, menu_items):
+    # query di atas tidak memfilter per menu; order_item per menu dicari saat menu dihapus
+    menu_id, = menu_items(1)
+    login(client, "admin")
+    plans = executed_plans(app, lambda: client.get(f"/admin/menu/delete/{menu_id}"))
+    assert any("ix_order_item_menu_item_id" in plan for plan in plans), plans
@@ -0,0 +1,45 @@
+import itertools
+
+import pytest
+from sqlalchemy import event, func
+
+from extensions import db
+from models import OrderEvent
+from services import realtime
+from services.realtime import record_order_update
+
+RETENTION = 5
+
+
+@pytest.fixture
+def app_config():
+    return {"ORDER_EVENT_RETENTION": RETENTION}
+
+
+@pytest.fixture
+def stepped_ids(monkeypatch):
+    """Id event ganjil saja (seperti MySQL dengan auto_increment_increment = 2): tidak pernah kelipatan 10."""
+    monkeypatch.setattr(realtime, "PRUNE_EVERY", 10)
+    monkeypatch.setattr(realtime, "_next_prune_id", 0)
+    ids = itertools.count(1, 2)
+
+    def assign_id(mapper, connection, target):
+        target.id = next(ids)
+
+    event.listen(OrderEvent, "before_insert", assign_id)
+    yield
+    event.remove(OrderEvent, "before_insert", assign_id)
+
+
+def test_order_events_are_pruned_with_id_gaps(ctx, stepped_ids):
+    for _ in range(60):
+        record_order_update({"order_id": 1, "item_id": 1, "status": "ready"})
+        db.session.commit()
+
+    oldest, newest, count = db.session.query(
+        func.min(OrderEvent.id), func.max(OrderEvent.id), func.count(OrderEvent.id)
+    ).one()
+    assert newest == 119
+    # dibersihkan paling lambat tiap PRUNE_EVERY id, menyisakan RETENTION id terakhir saat itu
+    assert newest - oldest < realtime.PRUNE_EVERY + RETENTION
+    assert count < 60
@@ -0,0 +1,36 @@
+from flask import Flask, request
+from flask_socketio import SocketIO, join_room
+
+from services.socket_queue import LocalQueueManager, socketio_queue_options
+
+CHANNEL = "test-socket-queue"
+
+
+def worker():
+    """Satu "worker" web: app + server Socket.IO sendiri, terhubung ke queue local:// yang sama."""
+    app = Flask(__name__)
+    server = SocketIO(app, **socketio_queue_options("local://", CHANNEL))
+
+    @server.on("connect")
+    def connect():
+        if request.args.get("room"):
+            join_room(request.args["room"])
+
+    return app, server
+
+
+def test_emit_reaches_clients_of_other_server():
+    app_a, server_a = worker()
+    app_b, server_b = worker()
+    assert isinstance(server_b.server.manager, LocalQueueManager)
+
+    kitchen = server_b.test_client(app_b, query_string="room=kitchen")
+    other = server_b.test_client(app_b, query_string="room=waiter")
+
+    with app_a.app_context():
+        server_a.emit("order_update", {"order_id": 7, "status": "ready"}, to="kitchen")
+
+    assert kitchen.get_received() == [
+        {"name": "order_update", "args": [{"order_id": 7, "status": "ready"}], "namespace": "/"}
+    ]
+    assert other.get_received() == []
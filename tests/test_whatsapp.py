@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app import create_app
+from extensions import db
+from models import WhatsAppOutbox
+from services import whatsapp
+from services.whatsapp import CLAIM_LEASE, OutboxWorker, enqueue_message
+
+MAX_ATTEMPTS = 3
+
+
+class StubGateway(HTTPServer):
+    """Gateway Fonnte palsu di localhost: status HTTP diambil berurutan dari `responses` (default 200)."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.responses = []
+        self.delay = 0.0
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/send"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        gateway = self.server
+        gateway.requests.append(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        time.sleep(gateway.delay)
+        status = gateway.responses.pop(0) if gateway.responses else 200
+        body = json.dumps({"status": status == 200}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gateway():
+    server = StubGateway()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app_config(tmp_path, gateway):
+    # database file: worker thread memakai koneksi sendiri
+    return {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'lamogo.db'}",
+        "FONNTE_API_URL": gateway.url,
+        "WHATSAPP_BACKOFF_BASE": 0,
+        "WHATSAPP_MAX_ATTEMPTS": MAX_ATTEMPTS,
+        "WHATSAPP_POLL_INTERVAL": 0.05,
+        "WHATSAPP_READ_TIMEOUT": 0.2,
+    }
+
+
+def outbox(message_id):
+    db.session.expire_all()
+    return db.session.get(WhatsAppOutbox, message_id)
+
+
+def queue(phone="0812 3456", message="Struk"):
+    queued = enqueue_message(phone, message)
+    db.session.commit()
+    return queued.id
+
+
+def test_message_is_sent(app, ctx, gateway):
+    message_id = queue()
+
+    assert OutboxWorker(app).run_once() == 1
+    sent = outbox(message_id)
+    assert (sent.status, sent.attempts, sent.last_error) == ("sent", 1, None)
+    assert "target=628123456" in gateway.requests[0]
+
+
+def test_transient_error_is_retried(app, ctx, gateway):
+    gateway.responses = [500]
+    message_id = queue()
+    worker = OutboxWorker(app)
+
+    worker.run_once()
+    failed = outbox(message_id)
+    assert (failed.status, failed.attempts) == ("pending", 1)
+    assert failed.last_error.startswith("HTTP 500")
+
+    worker.run_once()
+    sent = outbox(message_id)
+    assert (sent.status, sent.attempts, sent.last_error) == ("sent", 2, None)
+    assert len(gateway.requests) == 2
+
+
+def test_slow_gateway_times_out_and_is_retried(app, ctx, gateway):
+    gateway.delay = 0.5
+    message_id = queue()
+
+    OutboxWorker(app).run_once()
+    failed = outbox(message_id)
+    assert (failed.status, failed.attempts) == ("pending", 1)
+    assert "Timeout" in failed.last_error
+
+
+def test_message_is_dead_after_max_attempts(app, ctx, gateway):
+    gateway.responses = [500] * 10
+    message_id = queue()
+    worker = OutboxWorker(app)
+
+    for _ in range(MAX_ATTEMPTS):
+        worker.run_once()
+    dead = outbox(message_id)
+    assert (dead.status, dead.attempts) == ("dead", MAX_ATTEMPTS)
+
+    assert worker.run_once() == 0
+    assert len(gateway.requests) == MAX_ATTEMPTS
+
+
+def test_thread_worker_starts_on_first_request_and_drains_backlog(app, app_config, gateway, monkeypatch):
+    with app.app_context():
+        pending = queue(message="belum terkirim")
+        stuck = queue(message="worker mati saat mengirim")
+        # klaim worker lama sudah lewat lease-nya
+        db.session.execute(WhatsAppOutbox.__table__.update().where(WhatsAppOutbox.id == stuck)
+                           .values(status="sending", next_attempt_at=datetime.now() - CLAIM_LEASE))
+        db.session.commit()
+
+    monkeypatch.setattr(whatsapp, "_worker", None)
+    web = create_app({**app_config, "WHATSAPP_WORKER": "thread"})
+    # create_app() sendiri tidak menjalankan thread (flask db upgrade, CLI, dsb.)
+    assert whatsapp._worker is None
+    web.test_client().get("/")
+    try:
+        # tanpa checkout baru: worker jalan sejak request pertama
+        with web.app_context():
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if {outbox(pending).status, outbox(stuck).status} == {"sent"}:
+                    break
+                time.sleep(0.05)
+            assert outbox(pending).status == "sent"
+            assert outbox(stuck).status == "sent"
+    finally:
+        whatsapp._worker.stop()